@@ -12,9 +12,15 @@ class BoolPalette(framebuf.FrameBuffer):
     def __init__(self, mode):
         buf = bytearray(4)  # OK for <= 16 bit color
         super().__init__(buf, 2, 1, mode)
-    
+        self._fg = None  # Current colors: skip writes if unchanged
+        self._bg = None
+
     def fg(self, color):  # Set foreground color
-        self.pixel(1, 0, color)
+        if color != self._fg:
+            self._fg = color
+            self.pixel(1, 0, color)
 
     def bg(self, color):
-        self.pixel(0, 0, color)
+        if color != self._bg:
+            self._bg = color
+            self.pixel(0, 0, color)
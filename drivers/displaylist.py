@@ -0,0 +1,259 @@
+# displaylist.py Compact record of FrameBuffer drawing operations
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# A DisplayList has the drawing methods of a FrameBuffer. Calls are stored in an
+# array of 16-bit values and may be replayed into a FrameBuffer holding any band
+# of lines. AsyncSPIDisplay uses this in strip mode, where a full framebuf would
+# not fit in RAM. Each entry comprises the opcode, the bounding box x0, y0, x1, y1
+# (x0 <= x < x1, y0 <= y < y1) and the arguments. Values are signed: colors
+# above 0x7FFF read back negative, so blit colors are masked to 16 bits on
+# replay and "no blit key" has its own flag rather than being -1. Objects (blit sources, poly
+# coordinates and strings) are held in a list and referenced by index.
+# Blit sources are held by reference: their contents must not change while they
+# are on screen other than by being redrawn.
+# Entries wholly hidden by a later opaque fill_rect or blit are discarded when
+# the list is compacted. This occurs when its size has doubled since the last
+# compaction, so the size is bounded by what is visible.
+# The GUI also uses DisplayList instances to cache the output of widgets.
+
+from array import array
+from micropython import const
+from drivers.boolpalette import BoolPalette
+
+_RECT = const(0)  # Filled rectangle: color
+_ORECT = const(1)  # Rectangle outline: color
+_LINE = const(2)  # xa, ya, xb, yb, color
+_ELLIPSE = const(3)  # x, y, xr, yr, color, fill, quadrant mask
+_POLY = const(4)  # object, x, y, color, fill
+_BLIT = const(5)  # object, x, y, key, key flag, palette flag, bg, fg
+_TEXT = const(6)  # object, x, y, color
+_SIZE = (6, 6, 10, 12, 10, 13, 9)  # Entry length for each opcode
+_MIN = const(1024)  # Initial compaction threshold (16-bit values)
+
+
+# Return the width (vert False) or height of a FrameBuffer: reading a pixel
+# outside it returns None. Glyphs tend to share dimensions so n, the previous
+# result, is tried first.
+def _extent(fb, vert, n):
+    get = fb.pixel
+
+    def inside(k):
+        return (get(0, k) if vert else get(k, 0)) is not None
+
+    if n and inside(n - 1) and not inside(n):
+        return n
+    if not inside(0):
+        return 0
+    lo = 0
+    hi = 1
+    while inside(hi):
+        lo = hi
+        hi <<= 1
+    while hi - lo > 1:
+        m = (lo + hi) >> 1
+        if inside(m):
+            lo = m
+        else:
+            hi = m
+    return hi
+
+
+class DisplayList:
+    # Methods replacing those of a FrameBuffer
+    PRIMITIVES = ("fill", "fill_rect", "rect", "hline", "vline", "line", "pixel")
+    PRIMITIVES += ("ellipse", "poly", "blit", "text", "scroll")
+
+    def __init__(self, width, height, mode):
+        self.width = width
+        self.height = height
+        self._pal = BoolPalette(mode)  # Palette for replaying blits
+        self._bw = 0  # Dimensions of last blit source
+        self._bh = 0
+        self.clear()
+
+    # Discard all entries: the display is filled with color 0.
+    def clear(self):
+        self._cmds = array("h")
+        self._objs = []
+        self._limit = _MIN
+
+    def __len__(self):  # Size in 16-bit values
+        return len(self._cmds)
+
+    def _add(self, op, x0, y0, x1, y1, *args):
+        if x1 <= x0 or y1 <= y0 or x1 <= 0 or y1 <= 0 or x0 >= self.width or y0 >= self.height:
+            return  # Nothing visible
+        cmds = self._cmds
+        if op == _RECT and x0 <= 0 and y0 <= 0 and x1 >= self.width and y1 >= self.height:
+            self.clear()  # Everything is hidden
+            cmds = self._cmds
+        elif len(cmds) > self._limit:
+            self._compact()
+            cmds = self._cmds
+        if op >= _POLY:  # First arg is an object: store its index
+            self._objs.append(args[0])
+            args = (len(self._objs) - 1,) + args[1:]
+        a = cmds.append
+        a(op)
+        a(x0)
+        a(y0)
+        a(x1)
+        a(y1)
+        for v in args:
+            a(v)
+
+    # Discard entries hidden by later opaque ones.
+    def _compact(self):
+        cmds = self._cmds
+        offs = []
+        i = 0
+        while i < len(cmds):
+            offs.append(i)
+            i += _SIZE[cmds[i]]
+        keep = []
+        covers = []  # Opaque rectangles drawn later than the current entry
+        for i in reversed(offs):
+            x0, y0, x1, y1 = cmds[i + 1 : i + 5]
+            for c in covers:
+                if c[0] <= x0 and c[1] <= y0 and x1 <= c[2] and y1 <= c[3]:
+                    break
+            else:
+                keep.append(i)
+                op = cmds[i]
+                if op == _RECT or (op == _BLIT and not cmds[i + 9]):  # Opaque
+                    covers.append((x0, y0, x1, y1))
+        new = array("h")
+        objs = []
+        for i in reversed(keep):
+            op = cmds[i]
+            e = cmds[i : i + _SIZE[op]]
+            if op >= _POLY:  # Entry references an object
+                objs.append(self._objs[e[5]])
+                e[5] = len(objs) - 1
+            new.extend(e)
+        self._cmds = new
+        self._objs = objs
+        self._limit = max(_MIN, len(new) * 2)
+
+    # Replay entries intersecting lines y0 <= y < y1 and columns x0 <= x < x1
+    # into fb, whose first line is framebuf line y0.
+    def render(self, fb, y0, y1, x0=0, x1=None):
+        fb.fill(0)
+        self._draw(fb, y0, y1, x0, self.width if x1 is None else x1)
+
+    # Replay all entries into a full size fb without clearing it.
+    def replay(self, fb):
+        self._draw(fb, 0, self.height, 0, self.width)
+
+    # Return the bounding box (x, y, w, h) of all entries or None if empty.
+    def bounds(self):
+        c = self._cmds
+        if not (end := len(c)):
+            return None
+        x0 = y0 = 32767
+        x1 = y1 = -32768
+        i = 0
+        while i < end:
+            x0 = min(x0, c[i + 1])
+            y0 = min(y0, c[i + 2])
+            x1 = max(x1, c[i + 3])
+            y1 = max(y1, c[i + 4])
+            i += _SIZE[c[i]]
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _draw(self, fb, y0, y1, x0, x1):
+        c = self._cmds
+        objs = self._objs
+        i = 0
+        end = len(c)
+        while i < end:
+            op = c[i]
+            ex0 = c[i + 1]
+            ey0 = c[i + 2]
+            ex1 = c[i + 3]
+            ey1 = c[i + 4]
+            if ey0 < y1 and ey1 > y0 and ex0 < x1 and ex1 > x0:
+                if op == _RECT:
+                    fb.fill_rect(ex0, ey0 - y0, ex1 - ex0, ey1 - ey0, c[i + 5])
+                elif op == _ORECT:
+                    fb.rect(ex0, ey0 - y0, ex1 - ex0, ey1 - ey0, c[i + 5])
+                elif op == _LINE:
+                    fb.line(c[i + 5], c[i + 6] - y0, c[i + 7], c[i + 8] - y0, c[i + 9])
+                elif op == _ELLIPSE:
+                    fb.ellipse(
+                        c[i + 5], c[i + 6] - y0, c[i + 7], c[i + 8], c[i + 9], c[i + 10], c[i + 11]
+                    )
+                elif op == _POLY:
+                    fb.poly(c[i + 6], c[i + 7] - y0, objs[c[i + 5]], c[i + 8], c[i + 9])
+                elif op == _BLIT:
+                    key = c[i + 8] & 0xFFFF if c[i + 9] else -1
+                    if c[i + 10]:
+                        pal = self._pal
+                        pal.bg(c[i + 11] & 0xFFFF)
+                        pal.fg(c[i + 12] & 0xFFFF)
+                        fb.blit(objs[c[i + 5]], c[i + 6], c[i + 7] - y0, key, pal)
+                    else:
+                        fb.blit(objs[c[i + 5]], c[i + 6], c[i + 7] - y0, key)
+                else:  # _TEXT
+                    fb.text(objs[c[i + 5]], c[i + 6], c[i + 7] - y0, c[i + 8])
+            i += _SIZE[op]
+
+    # FrameBuffer methods
+    def fill(self, c):
+        self.clear()
+        self._add(_RECT, 0, 0, self.width, self.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._add(_RECT, x, y, x + w, y + h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        self._add(_RECT if f else _ORECT, x, y, x + w, y + h, c)
+
+    def hline(self, x, y, w, c):
+        self._add(_RECT, x, y, x + w, y + 1, c)
+
+    def vline(self, x, y, h, c):
+        self._add(_RECT, x, y, x + 1, y + h, c)
+
+    def line(self, xa, ya, xb, yb, c):
+        x0, x1 = (xa, xb) if xa < xb else (xb, xa)
+        y0, y1 = (ya, yb) if ya < yb else (yb, ya)
+        self._add(_LINE, x0, y0, x1 + 1, y1 + 1, xa, ya, xb, yb, c)
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            raise OSError("Pixel read not supported.")
+        self._add(_RECT, x, y, x + 1, y + 1, c)
+
+    def ellipse(self, x, y, xr, yr, c, f=False, m=0x0F):
+        self._add(_ELLIPSE, x - xr, y - yr, x + xr + 1, y + yr + 1, x, y, xr, yr, c, int(f), m)
+
+    def poly(self, x, y, coords, c, f=False):
+        if (n := len(coords)) < 2:
+            return
+        xs = coords[0 : n : 2]
+        ys = coords[1 : n : 2]
+        x0 = x + min(xs)
+        y0 = y + min(ys)
+        x1 = x + max(xs) + 1
+        y1 = y + max(ys) + 1
+        self._add(_POLY, x0, y0, x1, y1, array("h", coords), x, y, c, int(f))
+
+    def blit(self, fb, x, y, key=-1, palette=None):
+        self._bw = w = _extent(fb, False, self._bw)
+        self._bh = h = _extent(fb, True, self._bh)
+        k = 0 if key == -1 else 1  # An RGB565 key of 0xFFFF is stored as -1
+        if palette is None:
+            self._add(_BLIT, x, y, x + w, y + h, fb, x, y, key, k, 0, 0, 0)
+        else:  # Palette may change: record its colors
+            bg = palette.pixel(0, 0)
+            fg = palette.pixel(1, 0)
+            self._add(_BLIT, x, y, x + w, y + h, fb, x, y, key, k, 1, bg, fg)
+
+    def text(self, s, x, y, c=1):
+        self._add(_TEXT, x, y, x + 8 * len(s), y + 8, s, x, y, c)
+
+    def scroll(self, xstep, ystep):
+        raise OSError("Scroll not supported.")
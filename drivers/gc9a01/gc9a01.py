@@ -5,10 +5,7 @@
 # Released under the MIT license see LICENSE
 
 from time import sleep_ms
-import gc
-import framebuf
-import asyncio
-from drivers.boolpalette import BoolPalette
+from drivers.spidisplay import AsyncSPIDisplay
 
 # Initialisation ported from Russ Hughes' C driver
 # https://github.com/russhughes/gc9a01_mpy/
@@ -20,31 +17,7 @@ from drivers.boolpalette import BoolPalette
 # Waveshare touch board https://www.waveshare.com/wiki/1.28inch_Touch_LCD has CST816S touch controller
 # Touch controller uses I2C
 
-# Output RGB565 format, 16 bit/pixel:
-# g4 g3 g2 b7  b6 b5 b4 b3  r7 r6 r5 r4  r3 g7 g6 g5
-# Portrait mode. ~70μs on RP2 at standard clock.
-@micropython.viper
-def _lcopy(dest: ptr16, source: ptr8, lut: ptr16, length: int, gscale: bool):
-    n: int = 0
-    x: int = 0
-    while length:
-        c = source[x]  # Source byte holds two 4-bit colors
-        p = c >> 4  # current pixel
-        q = c & 0x0F  # next pixel
-        if gscale:  # Treat as greyscale
-            dest[n] = p >> 1 | p << 4 | p << 9 | ((p & 0x01) << 15)
-            n += 1
-            dest[n] = q >> 1 | q << 4 | q << 9 | ((q & 0x01) << 15)
-        else:  # Color lookup
-            dest[n] = lut[p]  # current pixel
-            n += 1
-            dest[n] = lut[q]  # next pixel
-        n += 1
-        x += 1
-        length -= 1
-
-
-class GC9A01(framebuf.FrameBuffer):
+class GC9A01(AsyncSPIDisplay):
 
     lut = bytearray(32)  # Color LUT holds all possible 16-bit colors
 
@@ -68,23 +41,10 @@ class GC9A01(framebuf.FrameBuffer):
         usd=False,
         mirror=False,
         init_spi=False,
+        lines_per_write=1,
     ):
-        self._spi = spi
-        self._cs = cs
-        self._dc = dc
+        super().__init__(spi, cs, dc, height, width, init_spi, lines_per_write)
         self._rst = rst
-        self.lock_mode = False  # If set, user lock is passed to .do_refresh
-        self.height = height  # Logical dimensions for GUIs
-        self.width = width
-        self._spi_init = init_spi
-        self._gscale = False  # Interpret buffer as index into color LUT
-        self.mode = framebuf.GS4_HMSB
-        self.palette = BoolPalette(self.mode)
-        gc.collect()
-        buf = bytearray(height * width // 2)  # Frame buffer
-        self.mvb = memoryview(buf)
-        super().__init__(buf, width, height, self.mode)
-        self._linebuf = bytearray(width * 2)  # Line buffer (16-bit colors)
 
         # Hardware reset
         self._rst(0)
@@ -93,7 +53,6 @@ class GC9A01(framebuf.FrameBuffer):
         sleep_ms(50)
         if self._spi_init:  # A callback was passed
             self._spi_init(spi)  # Bus may be shared
-        self._lock = asyncio.Lock()  # Prevent concurrent refreshes.
         sleep_ms(100)
         self._wcd(b"\x2a", int.to_bytes(width - 1, 4, "big"))
         # Default page address start == 0 end == 0xEF (239)
@@ -162,77 +121,3 @@ class GC9A01(framebuf.FrameBuffer):
             madctl ^= 0x80
         self._wcd(b"\x36", madctl.to_bytes(1, "big"))  # MADCTL: RGB portrait mode
         self._wcmd(b"\x29")  # display on
-
-    # Write a command.
-    def _wcmd(self, command):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(command)
-        self._cs(1)
-
-    # Write a command followed by a data arg.
-    def _wcd(self, command, data):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(command)
-        self._cs(1)
-        self._dc(1)
-        self._cs(0)
-        self._spi.write(data)
-        self._cs(1)
-
-    def greyscale(self, gs=None):
-        if gs is not None:
-            self._gscale = gs
-        return self._gscale
-
-    def show(self):  # Physical display is in portrait mode
-        clut = GC9A01.lut
-        lb = self._linebuf
-        buf = self.mvb
-        if self._spi_init:  # A callback was passed
-            self._spi_init(self._spi)  # Bus may be shared
-        self._wcmd(b"\x2c")  # WRITE_RAM
-        self._dc(1)
-        self._cs(0)
-        wd = self.width // 2
-        ht = self.height
-        cm = self._gscale  # color False, greyscale True
-        for start in range(0, wd * ht, wd):  # For each line
-            _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-            self._spi.write(lb)
-        self._cs(1)
-
-    def short_lock(self, v=None):
-        if v is not None:
-            self.lock_mode = v  # If set, user lock is passed to .do_refresh
-        return self.lock_mode
-
-    # nanogui apps typically call with no args. ugui and tgui pass split and
-    # may pass a Lock depending on lock_mode
-    async def do_refresh(self, split=4, elock=None):
-        if elock is None:
-            elock = asyncio.Lock()
-        async with self._lock:
-            lines, mod = divmod(self.height, split)  # Lines per segment
-            if mod:
-                raise ValueError("Invalid do_refresh arg.")
-            clut = GC9A01.lut
-            lb = self._linebuf
-            buf = self.mvb
-            self._wcmd(b"\x2c")  # WRITE_RAM
-            self._dc(1)
-            wd = self.width // 2
-            cm = self._gscale  # color False, greyscale True
-            line = 0
-            for _ in range(split):  # For each segment
-                async with elock:
-                    if self._spi_init:  # A callback was passed
-                        self._spi_init(self._spi)  # Bus may be shared
-                    self._cs(0)
-                    for start in range(wd * line, wd * (line + lines), wd):  # For each line
-                        _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-                        self._spi.write(lb)
-                    line += lines
-                    self._cs(1)  # Allow other tasks to use bus
-                await asyncio.sleep_ms(0)
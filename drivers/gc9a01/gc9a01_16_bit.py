@@ -162,6 +162,29 @@ class GC9A01(framebuf.FrameBuffer):
         self._spi.write(self.mvb)
         self._cs(1)
 
+    # Write a rectangular region of the framebuf to the display.
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        lw = self.width * 2  # Bytes per line
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._wcd(b"\x2a", int.to_bytes((x0 << 16) + x1 - 1, 4, "big"))
+        self._wcd(b"\x2b", int.to_bytes((y0 << 16) + y1 - 1, 4, "big"))
+        self._wcmd(b"\x2c")  # WRITE_RAM
+        self._dc(1)
+        self._cs(0)
+        for start in range(y0 * lw + x0 * 2, y1 * lw, lw):  # For each line
+            self._spi.write(self.mvb[start : start + (x1 - x0) * 2])
+        self._cs(1)
+        # Restore full screen window: .show and .do_refresh assume it.
+        self._wcd(b"\x2a", int.to_bytes(self.width - 1, 4, "big"))
+        self._wcd(b"\x2b", int.to_bytes(self.height - 1, 4, "big"))
+
     def short_lock(self, v=None):
         if v is not None:
             self.lock_mode = v  # If set, user lock is passed to .do_refresh
@@ -187,3 +210,14 @@ class GC9A01(framebuf.FrameBuffer):
                     self._spi.write(self.mvb[line * w : (line + lines) * w])
                     self._cs(1)  # Allow other tasks to use bus
                 await asyncio.sleep_ms(0)
+
+    # Refresh a list of (x, y, w, h) rectangles. The lock is released between
+    # rectangles to allow other tasks to access the bus.
+    async def do_refresh_rects(self, rects, elock=None):
+        if elock is None:
+            elock = asyncio.Lock()
+        async with self._lock:
+            for rect in rects:
+                async with elock:
+                    self.show_rect(*rect)
+                await asyncio.sleep_ms(0)
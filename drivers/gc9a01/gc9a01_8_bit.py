@@ -183,6 +183,34 @@ class GC9A01(framebuf.FrameBuffer):
             self._spi.write(lb)
         self._cs(1)
 
+    # Write a rectangular region of the framebuf to the display.
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        wd = self.width
+        nb = x1 - x0  # Pixels per line
+        lb = memoryview(self._linebuf)[: nb * 2]
+        buf = self.mvb
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._wcd(b"\x2a", int.to_bytes((x0 << 16) + x1 - 1, 4, "big"))
+        self._wcd(b"\x2b", int.to_bytes((y0 << 16) + y1 - 1, 4, "big"))
+        self._wcmd(b"\x2c")  # WRITE_RAM
+        self._dc(1)
+        self._cs(0)
+        s0 = y0 * wd + x0
+        for start in range(s0, s0 + (y1 - y0) * wd, wd):  # For each line
+            _lcopy(lb, buf[start:], nb)  # Copy and map colors
+            self._spi.write(lb)
+        self._cs(1)
+        # Restore full screen window: .show and .do_refresh assume it.
+        self._wcd(b"\x2a", int.to_bytes(self.width - 1, 4, "big"))
+        self._wcd(b"\x2b", int.to_bytes(self.height - 1, 4, "big"))
+
     def short_lock(self, v=None):
         if v is not None:
             self.lock_mode = v  # If set, user lock is passed to .do_refresh
@@ -214,3 +242,14 @@ class GC9A01(framebuf.FrameBuffer):
                     line += lines
                     self._cs(1)  # Allow other tasks to use bus
                 await asyncio.sleep_ms(0)
+
+    # Refresh a list of (x, y, w, h) rectangles. The lock is released between
+    # rectangles to allow other tasks to access the bus.
+    async def do_refresh_rects(self, rects, elock=None):
+        if elock is None:
+            elock = asyncio.Lock()
+        async with self._lock:
+            for rect in rects:
+                async with elock:
+                    self.show_rect(*rect)
+                await asyncio.sleep_ms(0)
@@ -0,0 +1,140 @@
+# bench.py Throughput benchmark for display drivers
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# Each driver is instantiated against mock buses and pins. For each size and
+# color mode the bytes sent, bus writes, CS transactions and time per frame are
+# reported for .show, for .do_refresh with the whole framebuf changing and for
+# .do_refresh with nothing changed ("idle"). Intended for the Unix port, to
+# catch performance regressions without hardware:
+# $ micropython -m drivers.headless.bench
+# Or at the REPL (drivers whose name contains "ili"):
+# from drivers.headless.bench import run
+# run("ili", frames=20)
+# Times depend on the host so compare them only between runs on one machine.
+
+import asyncio
+import gc
+from time import ticks_us, ticks_diff
+from drivers.headless.headless import MockSPI, MockI2C, MockPin
+
+
+# Constructors for each interface type. Return (ssd, bus, cs)
+def _spi(cls, h, w):  # spi, cs, dc, rst (or SSD13xx pincs, pindc, pinrs)
+    spi = MockSPI()
+    cs = MockPin(1)
+    return cls(spi, cs, MockPin(0), MockPin(1), height=h, width=w), spi, cs
+
+
+def _hl(cls, h, w):  # HEADLESS has no reset pin
+    spi = MockSPI()
+    cs = MockPin(1)
+    return cls(spi, cs, MockPin(0), height=h, width=w), spi, cs
+
+
+def _i2c(cls, h, w):
+    i2c = MockI2C()
+    return cls(w, h, i2c), i2c, None
+
+
+def _spi1306(cls, h, w):
+    spi = MockSPI()
+    cs = MockPin(1)
+    return cls(w, h, spi, MockPin(0), MockPin(1), cs), spi, cs
+
+
+# name, module, class, constructor, ((height, width), ...)
+DRIVERS = (
+    ("headless", "drivers.headless.headless", "HEADLESS", _hl, ((240, 320),)),
+    ("ili9341", "drivers.ili93xx.ili9341", "ILI9341", _spi, ((240, 320), (320, 240))),
+    ("ili9341_8bit", "drivers.ili93xx.ili9341_8bit", "ILI9341", _spi, ((240, 320),)),
+    ("ili9486", "drivers.ili94xx.ili9486", "ILI9486", _spi, ((320, 480), (480, 320))),
+    ("ili9488", "drivers.ili94xx.ili9488", "ILI9488", _spi, ((320, 480), (480, 320))),
+    ("gc9a01", "drivers.gc9a01.gc9a01", "GC9A01", _spi, ((240, 240),)),
+    ("gc9a01_8_bit", "drivers.gc9a01.gc9a01_8_bit", "GC9A01", _spi, ((240, 240),)),
+    ("gc9a01_16_bit", "drivers.gc9a01.gc9a01_16_bit", "GC9A01", _spi, ((240, 240),)),
+    ("st7789_4bit", "drivers.st7789.st7789_4bit", "ST7789", _spi, ((240, 240), (240, 320))),
+    ("st7789_8bit", "drivers.st7789.st7789_8bit", "ST7789", _spi, ((240, 240),)),
+    ("st7735r", "drivers.st7735r.st7735r", "ST7735R", _spi, ((128, 160),)),
+    ("st7735r_4bit", "drivers.st7735r.st7735r_4bit", "ST7735R", _spi, ((128, 160),)),
+    ("st7735r144", "drivers.st7735r.st7735r144", "ST7735R", _spi, ((128, 128),)),
+    ("st7735r144_4bit", "drivers.st7735r.st7735r144_4bit", "ST7735R", _spi, ((128, 128),)),
+    ("ssd1351", "drivers.ssd1351.ssd1351", "SSD1351", _spi, ((128, 128), (96, 128))),
+    ("ssd1351_4bit", "drivers.ssd1351.ssd1351_4bit", "SSD1351", _spi, ((128, 128),)),
+    ("ssd1351_16bit", "drivers.ssd1351.ssd1351_16bit", "SSD1351", _spi, ((128, 128),)),
+    ("ssd1351_generic", "drivers.ssd1351.ssd1351_generic", "SSD1351", _spi, ((128, 128),)),
+    ("ssd1331", "drivers.ssd1331.ssd1331", "SSD1331", _spi, ((64, 96),)),
+    ("ssd1331_16bit", "drivers.ssd1331.ssd1331_16bit", "SSD1331", _spi, ((64, 96),)),
+    ("ssd1306_i2c", "drivers.ssd1306.ssd1306", "SSD1306_I2C", _i2c, ((64, 128), (32, 128))),
+    ("ssd1306_spi", "drivers.ssd1306.ssd1306", "SSD1306_SPI", _spi1306, ((64, 128),)),
+    ("st7567s", "drivers.st7567s.st7567s", "ST7567", _i2c, ((64, 128),)),
+)
+
+
+# Return mean (bytes, writes, CS transactions, μs) per frame of an operation.
+# If draw is True the framebuf is changed before each frame.
+async def _measure(ssd, bus, cs, op, frames, split, draw):
+    nbytes = writes = lows = us = 0
+    for n in range(frames):
+        if draw:
+            ssd.fill(n & 1)  # Every pixel changes
+        bus.reset()
+        if cs is not None:
+            cs.lows = 0
+        t = ticks_us()
+        if op == "show":
+            ssd.show()
+        else:
+            await ssd.do_refresh(split)
+        us += ticks_diff(ticks_us(), t)
+        nbytes += bus.nbytes
+        writes += bus.writes
+        lows += 0 if cs is None else cs.lows
+    return nbytes // frames, writes // frames, lows // frames, us // frames
+
+
+async def _bench(cls, make, h, w, frames, split):
+    ssd, bus, cs = make(cls, h, w)
+    modes = (False, True) if hasattr(ssd, "greyscale") else (None,)
+    ops = ("show", "refresh", "idle") if hasattr(ssd, "do_refresh") else ("show",)
+    s = split  # As used by tgui: older drivers need a factor of the height
+    if not hasattr(ssd, "BUDGET"):
+        s = max(y for y in range(1, split + 1) if not h % y)
+    res = []
+    for mode in modes:
+        if mode is not None:
+            ssd.greyscale(mode)
+        for op in ops:
+            if op == "idle":
+                await _measure(ssd, bus, cs, op, 1, s, False)  # Settle after last change
+            r = await _measure(ssd, bus, cs, op, frames, s, op != "idle")
+            res.append(("mono" if mode is None else "grey" if mode else "color", op, r))
+    return res
+
+
+# Benchmark drivers whose name contains match ("" for all).
+def run(match="", frames=10, split=8):  # tgui uses split=8
+    print(f"{'Driver':<16} {'Size':>8} {'Mode':<6}{'Op':<8}{'Bytes':>8}{'Writes':>8}{'CS':>7}{'μs':>9}")
+    for name, mod, cname, make, sizes in DRIVERS:
+        if match not in name:
+            continue
+        gc.collect()
+        try:
+            cls = getattr(__import__(mod, None, None, [cname]), cname)
+        except Exception as e:
+            print(f"{name:<16} skipped: {e}")
+            continue
+        for h, w in sizes:
+            try:
+                res = asyncio.run(_bench(cls, make, h, w, frames, split))
+            except Exception as e:
+                print(f"{name:<16} {w:>4}x{h:<3} failed: {e}")
+                continue
+            for mode, op, r in res:
+                print(f"{name:<16} {w:>4}x{h:<3} {mode:<6}{op:<8}{r[0]:>8}{r[1]:>8}{r[2]:>7}{r[3]:>9}")
+            gc.collect()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,145 @@
+# headless.py Display driver with no hardware, for testing and benchmarking
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# The HEADLESS class shares the AsyncSPIDisplay base with the ILI9341 driver and
+# performs identical color conversion. Output goes to a
+# MockSPI which counts bytes and transactions. Frames may be saved as PPM
+# files. This enables the GUI to run on the Unix port, e.g.
+# from drivers.headless.headless import HEADLESS as SSD
+# ssd = SSD(height=240, width=320)
+# The mock bus and pin classes are also used by bench.py to benchmark drivers.
+
+from drivers.spidisplay import AsyncSPIDisplay
+
+# Stands in for a Pin. Records the number of calls which set it low.
+class MockPin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, value=1):
+        self._v = value
+        self.lows = 0  # For CS this is the number of bus transactions
+
+    def init(self, mode=None, value=None, **_):
+        if value is not None:
+            self(value)
+
+    def __call__(self, v=None):
+        if v is not None:
+            if not v and self._v:
+                self.lows += 1
+            self._v = v
+        return self._v
+
+    def value(self, v=None):
+        return self(v)
+
+    def irq(self, *_, **__):
+        pass
+
+
+# Stands in for an SPI bus. Counts bytes and calls to .write
+class MockSPI:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nbytes = 0
+        self.writes = 0
+
+    def init(self, **_):
+        pass
+
+    def write(self, buf):
+        self.nbytes += len(buf)
+        self.writes += 1
+
+    def write_readinto(self, wbuf, rbuf):
+        self.write(wbuf)
+        for n in range(len(rbuf)):
+            rbuf[n] = 0
+
+
+# Stands in for an I2C bus. Counts bytes and transactions.
+class MockI2C:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nbytes = 0
+        self.writes = 0
+
+    def writeto(self, addr, buf, stop=True):
+        self.nbytes += len(buf)
+        self.writes += 1
+
+    def writevto(self, addr, bufs, stop=True):
+        for buf in bufs:
+            self.nbytes += len(buf)
+        self.writes += 1
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self.writes += 1
+        for n in range(len(buf)):
+            buf[n] = 0
+
+
+class HEADLESS(AsyncSPIDisplay):
+
+    lut = bytearray(32)
+
+    # Same 16 bit color mapping as ILI9341.
+    @staticmethod
+    def rgb(r, g, b):
+        return (r & 0xF8) | (g & 0xE0) >> 5 | (g & 0x1C) << 11 | (b & 0xF8) << 5
+
+    def __init__(self, spi=None, cs=None, dc=None, height=240, width=320, lines_per_write=1):
+        spi = MockSPI() if spi is None else spi
+        cs = MockPin(1) if cs is None else cs
+        dc = MockPin(0) if dc is None else dc
+        super().__init__(spi, cs, dc, height, width, False, lines_per_write)
+        self._vsflip = False  # Support hardware scrolling
+        self.frames = 0  # Number of full refreshes
+
+    # Return (bytes, SPI writes, CS transactions) since last reset.
+    def stats(self):
+        return self._spi.nbytes, self._spi.writes, self._cs.lows
+
+    def reset_stats(self):
+        self._spi.reset()
+        self._cs.lows = 0
+        self.frames = 0
+
+    def show(self):
+        super().show()
+        self.frames += 1
+
+    async def do_refresh(self, split=4, elock=None, budget=None):
+        await super().do_refresh(split, elock, budget)
+        self.frames += 1
+
+    # Save the framebuf as a binary PPM file, converting colors exactly as they
+    # would be sent to an ILI9341.
+    def ppm(self, filename):
+        clut = self._table()
+        wd = self.width // 2
+        lb = memoryview(self._linebuf)[: self.width * 2]
+        rgb = bytearray(self.width * 3)
+        with open(filename, "wb") as f:
+            f.write(f"P6\n{self.width} {self.height}\n255\n".encode())
+            for y in range(self.height):
+                if self._sl and not y % self._sl:  # Strip mode
+                    self._render(y)
+                start = (y - self._sy) * wd
+                self._kernel(self._linebuf, self.mvb[start:], clut, wd, self._gscale)
+                n = 0
+                for x in range(0, len(lb), 2):  # Big-endian RGB565 in linebuf
+                    hi = lb[x]
+                    lo = lb[x + 1]
+                    rgb[n] = hi & 0xF8
+                    rgb[n + 1] = (hi & 0x07) << 5 | (lo & 0xE0) >> 3
+                    rgb[n + 2] = (lo & 0x1F) << 3
+                    n += 3
+                f.write(rgb)
@@ -9,38 +9,10 @@
 # https://forum.micropython.org/viewtopic.php?f=18&t=9368
 
 from time import sleep_ms
-import gc
-import framebuf
-import asyncio
-from drivers.boolpalette import BoolPalette
+from drivers.spidisplay import AsyncSPIDisplay
 
 
-# Output RGB565 format, 16 bit/pixel:
-# g4 g3 g2 b7  b6 b5 b4 b3  r7 r6 r5 r4  r3 g7 g6 g5
-# ~80μs on RP2 @ 250MHz.
-@micropython.viper
-def _lcopy(dest: ptr16, source: ptr8, lut: ptr16, length: int, gscale: bool):
-    # rgb565 - 16bit/pixel
-    n: int = 0
-    x: int = 0
-    while length:
-        c = source[x]
-        p = c >> 4  # current pixel
-        q = c & 0x0F  # next pixel
-        if gscale:
-            dest[n] = p >> 1 | p << 4 | p << 9 | ((p & 0x01) << 15)
-            n += 1
-            dest[n] = q >> 1 | q << 4 | q << 9 | ((q & 0x01) << 15)
-        else:
-            dest[n] = lut[p]  # current pixel
-            n += 1
-            dest[n] = lut[q]  # next pixel
-        n += 1
-        x += 1
-        length -= 1
-
-
-class ILI9341(framebuf.FrameBuffer):
+class ILI9341(AsyncSPIDisplay):
 
     lut = bytearray(32)
 
@@ -65,26 +37,13 @@ class ILI9341(framebuf.FrameBuffer):
         init_spi=False,
         mod=None,
         bgr=False,
+        lines_per_write=1,
     ):
         """For more information see
         https://github.com/peterhinch/micropython-nano-gui/blob/master/DRIVERS.md#32-drivers-for-ili9341
         """
-        self._spi = spi
-        self._cs = cs
-        self._dc = dc
+        super().__init__(spi, cs, dc, height, width, init_spi, lines_per_write)
         self._rst = rst
-        self.lock_mode = False  # If set, user lock is passed to .do_refresh
-        self.height = height
-        self.width = width
-        self._spi_init = init_spi
-        self._gscale = False  # Interpret buffer as index into color LUT
-        self.mode = framebuf.GS4_HMSB
-        self.palette = BoolPalette(self.mode)
-        gc.collect()
-        buf = bytearray(self.height * self.width // 2)
-        self.mvb = memoryview(buf)
-        super().__init__(buf, self.width, self.height, self.mode)
-        self._linebuf = bytearray(self.width * 2)
         # Hardware reset
         self._rst(0)
         sleep_ms(50)
@@ -92,7 +51,6 @@ class ILI9341(framebuf.FrameBuffer):
         sleep_ms(50)
         if self._spi_init:  # A callback was passed
             self._spi_init(spi)  # Bus may be shared
-        self._lock = asyncio.Lock()
         # Send initialization commands
         self._wcmd(b"\x01")  # SWRESET Software reset
         sleep_ms(100)
@@ -117,6 +75,10 @@ class ILI9341(framebuf.FrameBuffer):
             v = mod << 5
         v = v if bgr else (v | 8)
         self._wcd(b"\x36", int.to_bytes(v, 1, "big"))
+        # Hardware scrolling is along the 320 line axis: portrait only. MY reverses
+        # the order of framebuf lines relative to the scan.
+        if self.height == 320 and not v & 0x20:
+            self._vsflip = bool(v & 0x80)
         self._wcd(b"\x37", b"\x00")  # VSCRSADD Vertical scrolling start address
         self._wcd(b"\x3a", b"\x55")  # PIXFMT COLMOD: Pixel format 16 bits (MCU & interface)
         self._wcd(b"\xb1", b"\x00\x18")  # FRMCTR1 Frame rate ctrl
@@ -131,87 +93,3 @@ class ILI9341(framebuf.FrameBuffer):
         sleep_ms(100)
         self._wcmd(b"\x29")  # DISPLAY_ON
         sleep_ms(100)
-
-    # Write a command.
-    def _wcmd(self, buf):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(buf)
-        self._cs(1)
-
-    # Write a command followed by a data arg.
-    def _wcd(self, command, data):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(command)
-        self._cs(1)
-        self._dc(1)
-        self._cs(0)
-        self._spi.write(data)
-        self._cs(1)
-
-    def greyscale(self, gs=None):
-        if gs is not None:
-            self._gscale = gs
-        return self._gscale
-
-    # Time (ESP32 stock freq) 196ms portrait, 185ms landscape.
-    # mem free on ESP32 43472 bytes (vs 110192)
-    @micropython.native
-    def show(self):
-        clut = ILI9341.lut
-        wd = self.width // 2
-        ht = self.height
-        cm = self._gscale  # color False, greyscale True
-        lb = self._linebuf
-        buf = self.mvb
-        if self._spi_init:  # A callback was passed
-            self._spi_init(self._spi)  # Bus may be shared
-        # Commands needed to start data write
-        self._wcd(b"\x2a", int.to_bytes(self.width, 4, "big"))  # SET_COLUMN
-        self._wcd(b"\x2b", int.to_bytes(ht, 4, "big"))  # SET_PAGE
-        self._wcmd(b"\x2c")  # WRITE_RAM
-        self._dc(1)
-        self._cs(0)
-        for start in range(0, wd * ht, wd):  # For each line
-            _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-            self._spi.write(lb)
-        self._cs(1)
-
-    def short_lock(self, v=None):
-        if v is not None:
-            self.lock_mode = v  # If set, user lock is passed to .do_refresh
-        return self.lock_mode
-
-    # nanogui apps typically call with no args. ugui and tgui pass split and
-    # may pass a Lock depending on lock_mode
-    async def do_refresh(self, split=4, elock=None):
-        if elock is None:
-            elock = asyncio.Lock()
-        async with self._lock:
-            lines, mod = divmod(self.height, split)  # Lines per segment
-            if mod:
-                raise ValueError("Invalid do_refresh arg.")
-            clut = ILI9341.lut
-            wd = self.width // 2
-            ht = self.height
-            cm = self._gscale  # color False, greyscale True
-            lb = self._linebuf
-            buf = self.mvb
-            # Commands needed to start data write
-            self._wcd(b"\x2a", int.to_bytes(self.width, 4, "big"))  # SET_COLUMN
-            self._wcd(b"\x2b", int.to_bytes(ht, 4, "big"))  # SET_PAGE
-            self._wcmd(b"\x2c")  # WRITE_RAM
-            self._dc(1)
-            line = 0
-            for _ in range(split):  # For each segment
-                async with elock:
-                    if self._spi_init:  # A callback was passed
-                        self._spi_init(self._spi)  # Bus may be shared
-                    self._cs(0)
-                    for start in range(wd * line, wd * (line + lines), wd):  # For each line
-                        _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-                        self._spi.write(lb)
-                    line += lines
-                    self._cs(1)  # Allow other tasks to use bus
-                await asyncio.sleep_ms(0)
@@ -12,34 +12,9 @@
 # Address Set registers. This avoids having to use commands with multi-byte data values,
 # which would necessitate special code for the Waveshare Pi HAT (see DRIVERS.md).
 
-from time import sleep_ms
-import gc
-import framebuf
+from time import sleep_ms, ticks_us, ticks_diff
 import asyncio
-from drivers.boolpalette import BoolPalette
-
-# Portrait mode
-@micropython.viper
-def _lcopy(dest: ptr16, source: ptr8, lut: ptr16, length: int, gscale: bool):
-    # rgb565 - 16bit/pixel
-    n: int = 0
-    x: int = 0
-    while length:
-        c = source[x]
-        p = c >> 4  # current pixel
-        q = c & 0x0F  # next pixel
-        if gscale:
-            dest[n] = p >> 1 | p << 4 | p << 9 | ((p & 0x01) << 15)
-            n += 1
-            dest[n] = q >> 1 | q << 4 | q << 9 | ((q & 0x01) << 15)
-        else:
-            dest[n] = lut[p]  # current pixel
-            n += 1
-            dest[n] = lut[q]  # next pixel
-        n += 1
-        x += 1
-        length -= 1
-
+from drivers.spidisplay import AsyncSPIDisplay
 
 # FB is in landscape mode, hence issue a column at a time to portrait mode hardware.
 @micropython.viper
@@ -63,7 +38,8 @@ def _lscopy(dest: ptr16, source: ptr8, lut: ptr16, ch: int, gscale: bool):
         height -= 1
 
 
-class ILI9486(framebuf.FrameBuffer):
+class ILI9486(AsyncSPIDisplay):
+    BANDS = 0  # Band windows would need multi-byte commands: see above
 
     lut = bytearray(32)
     COLOR_INVERT = 0
@@ -80,26 +56,29 @@ class ILI9486(framebuf.FrameBuffer):
 
     # Transpose width & height for landscape mode
     def __init__(
-        self, spi, cs, dc, rst, height=320, width=480, usd=False, mirror=False, init_spi=False
+        self,
+        spi,
+        cs,
+        dc,
+        rst,
+        height=320,
+        width=480,
+        usd=False,
+        mirror=False,
+        init_spi=False,
+        lines_per_write=1,
     ):
-        self._spi = spi
-        self._cs = cs
-        self._dc = dc
+        super().__init__(spi, cs, dc, height, width, init_spi, lines_per_write)
         self._rst = rst
-        self.lock_mode = False  # If set, user lock is passed to .do_refresh
-        self.height = height  # Logical dimensions for GUIs
-        self.width = width
         self._long = max(height, width)  # Physical dimensions of screen and aspect ratio
         self._short = min(height, width)
-        self._spi_init = init_spi
-        self._gscale = False  # Interpret buffer as index into color LUT
-        self.mode = framebuf.GS4_HMSB
-        self.palette = BoolPalette(self.mode)
-        gc.collect()
-        buf = bytearray(height * width // 2)
-        self.mvb = memoryview(buf)
-        super().__init__(buf, width, height, self.mode)  # Logical aspect ratio
-        self._linebuf = bytearray(self._short * 2)
+        self._full = True  # Full screen window is set
+        # A 320x480 display may be the Waveshare HAT, which can only use the
+        # full screen window. Rectangles are then sent by a full refresh.
+        self._hat = self._short == 320 and self._long == 480
+        if self.dlist is not None:  # Strips need windows. In landscape columns span all strips.
+            if width > height or self._hat:
+                raise ValueError("Strip mode requires portrait orientation and not 320x480.")
 
         # Hardware reset
         self._rst(0)
@@ -108,7 +87,6 @@ class ILI9486(framebuf.FrameBuffer):
         sleep_ms(50)
         if self._spi_init:  # A callback was passed
             self._spi_init(spi)  # Bus may be shared
-        self._lock = asyncio.Lock()
         # Send initialization commands
 
         self._wcmd(b"\x01")  # SWRESET Software reset
@@ -132,102 +110,116 @@ class ILI9486(framebuf.FrameBuffer):
         self._wcmd(b"\x11")  # sleep out
         self._wcmd(b"\x29")  # display on
 
-    # Write a command.
-    def _wcmd(self, command):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(command)
-        self._cs(1)
-
-    # Write a command followed by a data arg.
-    def _wcd(self, command, data):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(command)
-        self._cs(1)
-        self._dc(1)
-        self._cs(0)
-        self._spi.write(data)
-        self._cs(1)
-
-    def greyscale(self, gs=None):
-        if gs is not None:
-            self._gscale = gs
-        return self._gscale
-
-    # @micropython.native  # Made almost no difference to timing
-    def show(self):  # Physical display is in portrait mode
-        clut = ILI9486.lut
-        lb = self._linebuf
+    # The window is only sent when it differs from the one in use. Full screen
+    # writes can then use the defaults set by ._init, which allows for the
+    # Waveshare HAT (see above).
+    def _region(self, x0, y0, x1, y1):
+        full = x0 == y0 == 0 and x1 == self._short and y1 == self._long
+        if not (full and self._full):
+            super()._region(x0, y0, x1, y1)
+        self._full = full
+
+    # Landscape: write framebuf columns c0 >= col > c1 to the portrait hardware
+    # in batches of ._lpw columns.
+    def _cols(self, c0, c1):
+        clut = self.lut
+        kb = memoryview(self._linebuf)
         buf = self.mvb
         cm = self._gscale  # color False, greyscale True
+        write = self._spi.write
+        cb = self.height * 2  # Bytes per column
+        cargs = (self.height << 9) + (self.width << 18)  # Viper 4-arg limit
+        col = c0
+        while col > c1:
+            n = min(self._lpw, col - c1)  # Columns in this batch
+            for i in range(n):  # For each column of landscape display
+                _lscopy(kb[i * cb :], buf, clut, col - i + cargs, cm)  # Copy and map colors
+            write(kb[: n * cb])
+            col -= n
+
+    # Portrait 214ms on RP2 120MHz, 30MHz SPI clock. Landscape 264ms.
+    def show(self):
+        if self.width < self.height:  # Portrait
+            super().show()
+            return
         if self._spi_init:  # A callback was passed
             self._spi_init(self._spi)  # Bus may be shared
-        self._wcmd(b"\x2c")  # WRITE_RAM
-        self._dc(1)
-        self._cs(0)
-        if self.width < self.height:  # Portrait 214ms on RP2 120MHz, 30MHz SPI clock
-            wd = self.width // 2
-            ht = self.height
-            for start in range(0, wd * ht, wd):  # For each line
-                _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-                self._spi.write(lb)
-        else:  # Landscpe 264ms on RP2 120MHz, 30MHz SPI clock
-            width = self.width
-            wd = width - 1
-            cargs = (self.height << 9) + (width << 18)  # Viper 4-arg limit
-            for col in range(width):  # For each column of landscape display
-                _lscopy(lb, buf, clut, wd - col + cargs, cm)  # Copy and map colors
-                self._spi.write(lb)
+        self._region(0, 0, self._short, self._long)
+        self._start(self.RAMWR)
+        self._cols(self.width - 1, -1)
         self._cs(1)
 
-    def short_lock(self, v=None):
-        if v is not None:
-            self.lock_mode = v  # If set, user lock is passed to .do_refresh
-        return self.lock_mode
+    # Write a rectangular region of the framebuf to the display. In landscape mode
+    # the region is rotated onto the portrait hardware.
+    def show_rect(self, x, y, w, h):
+        if self._hat:
+            self.show()
+            return
+        if self.width < self.height:  # Portrait
+            super().show_rect(x, y, w, h)
+            return
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        width = self.width
+        lb = memoryview(self._linebuf)[: (y1 - y0) * 2]
+        src = self.mvb[y0 * (width // 2) :]
+        cargs = ((y1 - y0) << 9) + (width << 18)  # Viper 4-arg limit
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        # Hardware rows are framebuf columns in reverse order
+        self._region(y0, width - x1, y1, width - x0)
+        self._start(self.RAMWR)
+        for col in range(x1 - 1, x0 - 1, -1):  # For each column of landscape display
+            _lscopy(lb, src, self.lut, col + cargs, self._gscale)  # Copy and map colors
+            self._spi.write(lb)
+        self._cs(1)
 
     # nanogui apps typically call with no args. ugui and tgui pass split and
-    # may pass a Lock depending on lock_mode
-    async def do_refresh(self, split=4, elock=None):
+    # may pass a Lock depending on lock_mode. budget is as for AsyncSPIDisplay.
+    async def do_refresh(self, split=4, elock=None, budget=None):
+        if self.width < self.height:  # Portrait: write sets of rows
+            await super().do_refresh(split, elock, budget)
+            return
         if elock is None:
             elock = asyncio.Lock()
+        if budget is None:
+            budget = self.BUDGET
+        if split < 1:
+            raise ValueError("Invalid do_refresh arg.")
         async with self._lock:
-            lines, mod = divmod(self._long, split)  # Lines per segment
-            if mod:
-                raise ValueError("Invalid do_refresh arg.")
-            clut = ILI9486.lut
-            lb = self._linebuf
-            buf = self.mvb
-            cm = self._gscale  # color False, greyscale True
-            self._wcmd(b"\x2c")  # WRITE_RAM
-            self._dc(1)
-            if self.width < self.height:  # Portrait: write sets of rows
-                wd = self.width // 2
-                line = 0
-                for _ in range(split):  # For each segment
-                    async with elock:
-                        if self._spi_init:  # A callback was passed
-                            self._spi_init(self._spi)  # Bus may be shared
-                        self._cs(0)
-                        for start in range(wd * line, wd * (line + lines), wd):  # For each line
-                            _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-                            self._spi.write(lb)
-                        line += lines
-                        self._cs(1)  # Allow other tasks to use bus
-                    await asyncio.sleep_ms(0)
-            else:  # Landscape: write sets of cols. lines is no. of cols per segment.
-                cargs = (self.height << 9) + (self.width << 18)  # Viper 4-arg limit
-                sc = self.width - 1  # Start and end columns
-                ec = sc - lines  # End column
-                for _ in range(split):  # For each segment
-                    async with elock:
-                        if self._spi_init:  # A callback was passed
-                            self._spi_init(self._spi)  # Bus may be shared
-                        self._cs(0)
-                        for col in range(sc, ec, -1):  # For each column of landscape display
-                            _lscopy(lb, buf, clut, col + cargs, cm)  # Copy and map colors
-                            self._spi.write(lb)
-                        sc -= lines
-                        ec -= lines
-                        self._cs(1)  # Allow other tasks to use bus
-                    await asyncio.sleep_ms(0)
+            wd = self.width
+            split = min(split, wd)
+            sc = wd - 1  # Start column
+            n = 0  # Segment no.
+            while sc >= 0:  # For each segment
+                async with elock:
+                    if self._spi_init:  # A callback was passed
+                        self._spi_init(self._spi)  # Bus may be shared
+                    if sc == wd - 1:
+                        self._region(0, 0, self._short, self._long)
+                        self._start(self.RAMWR)
+                    else:
+                        self._cs(0)  # Controller continues the write
+                    t = ticks_us()
+                    n += 1
+                    ec = -1 if budget else wd - 1 - n * wd // split  # End column
+                    while sc > ec:
+                        c = max(sc - 8, ec) if budget else ec  # Check budget every 8 columns
+                        self._cols(sc, c)
+                        sc = c
+                        if budget and ticks_diff(ticks_us(), t) >= budget:
+                            break
+                    self._cs(1)  # Allow other tasks to use bus
+                await asyncio.sleep_ms(0)
+
+    # On the Waveshare HAT all rectangles are sent by a single full refresh.
+    async def do_refresh_rects(self, rects, elock=None):
+        if self._hat:
+            if rects:
+                await self.do_refresh(elock=elock)
+            return
+        await super().do_refresh_rects(rects, elock)
@@ -0,0 +1,494 @@
+# spidisplay.py Base class for SPI color displays with a 4-bit framebuf
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# AsyncSPIDisplay implements the bus access, refresh and locking logic common to
+# controllers such as ILI9341, ILI9486, ILI9488, ST7789 and GC9A01. A chip driver
+# subclasses it, providing the lut, .rgb and the initialisation sequence.
+# Controllers whose address commands differ from the MIPI DCS defaults override
+# the class variables or ._region.
+# By default pixels are output as RGB565. Each source byte holds two pixels, so
+# conversion uses a 256 entry table of 32-bit pixel pairs built from the lut (or
+# the greyscale mapping). This is rebuilt only when the lut or greyscale mode
+# changes. A driver for another pixel format passes a viper function
+# kernel(dest, source, lut, length, gscale) converting length bytes of GS4
+# source to .BPP bytes per pixel in dest.
+# .do_refresh divides the framebuf into .BANDS horizontal bands and keeps a hash
+# of each. Bands whose contents are unchanged since they were last sent are
+# skipped. Any other write to the display (.show, .show_rect) or a change to the
+# lut or greyscale mode causes the next .do_refresh to send every band.
+# Drivers whose orientation allows it support hardware vertical scrolling
+# (.vscroll_area, .vscroll). When scrolled, framebuf lines in the scroll area are
+# stored in controller rows rotated by the scroll offset.
+# If .STRIP is nonzero the framebuf holds only that many lines. Drawing methods
+# are recorded in a DisplayList (.dlist) which is replayed into the strip buffer
+# for each group of lines sent. With .BANDS nonzero each strip is a band.
+# .do_refresh yields to asyncio between segments. By default the framebuf is
+# divided into split segments of (nearly) equal height. If a time budget is set
+# (.BUDGET or the budget arg) a segment instead ends once it has run for that
+# many μs, bounding the latency seen by other tasks on any panel height.
+
+import framebuf
+import gc
+import asyncio
+from time import ticks_us, ticks_diff
+from micropython import const
+from drivers.boolpalette import BoolPalette
+from drivers.displaylist import DisplayList
+
+_STEP = const(8)  # Lines sent between checks of the do_refresh time budget
+
+
+# Output RGB565 format, 16 bit/pixel:
+# g4 g3 g2 b7  b6 b5 b4 b3  r7 r6 r5 r4  r3 g7 g6 g5
+# Build the table of pixel pairs. Entry n holds the RGB565 values of the two
+# pixels in a source byte n, the left hand pixel in the LS half so that it is
+# sent first. gsxor inverts greyscale output on controllers that require it.
+@micropython.viper
+def _mkpairs(pairs: ptr32, lut: ptr16, gscale: bool, gsxor: int):
+    p: int = 0
+    while p < 16:
+        if gscale:
+            a = (p >> 1 | p << 4 | p << 9 | (p & 0x01) << 15) ^ gsxor
+        else:
+            a = int(lut[p])
+        q: int = 0
+        while q < 16:
+            if gscale:
+                b = (q >> 1 | q << 4 | q << 9 | (q & 0x01) << 15) ^ gsxor
+            else:
+                b = int(lut[q])
+            pairs[p << 4 | q] = a | b << 16
+            q += 1
+        p += 1
+
+
+# Hash length bytes of source, storing the result in hashes[n]. Return True if
+# it differs from the value previously stored. Comparing stored values ensures
+# that the hash is truncated to 32 bits on 64 bit platforms.
+@micropython.viper
+def _bhash(hashes: ptr32, n: int, source: ptr8, length: int) -> bool:
+    h: int = 5381
+    i: int = 0
+    while i < length:
+        h = ((h << 5) + h) ^ source[i]  # djb2a
+        i += 1
+    old = hashes[n]
+    hashes[n] = h
+    return hashes[n] != old
+
+
+# Default kernel: one table lookup and one 32-bit store per source byte.
+@micropython.viper
+def _pcopy(dest: ptr32, source: ptr8, pairs: ptr32, length: int, gscale: bool):
+    n: int = 0
+    while n < length:
+        dest[n] = pairs[source[n]]
+        n += 1
+
+
+class AsyncSPIDisplay(framebuf.FrameBuffer):
+    CASET = b"\x2a"  # Column address set
+    PASET = b"\x2b"  # Page (row) address set
+    RAMWR = b"\x2c"  # Memory write
+    RAMWRC = None  # Memory write continue: needed if a write ends when CS goes high
+    BPP = 2  # Bytes per pixel sent to the display
+    GSXOR = 0  # XOR mask applied to greyscale output by the default kernel
+    BANDS = 16  # Number of bands hashed by .do_refresh. 0 disables change detection.
+    STRIP = 0  # Lines in strip buffer. 0 allocates a full framebuf.
+    BUDGET = 0  # Default μs per .do_refresh segment. 0 divides refresh by split.
+
+    def __init__(self, spi, cs, dc, height, width, init_spi=False, lines_per_write=1, kernel=None):
+        self._spi = spi
+        self._cs = cs
+        self._dc = dc
+        self.lock_mode = False  # If set, user lock is passed to .do_refresh
+        self.height = height  # Logical dimensions for GUIs
+        self.width = width
+        self._spi_init = init_spi
+        if kernel is None:  # RGB565 using a table of pixel pairs
+            self._kernel = _pcopy
+            self._pairs = bytearray(1024)
+        else:
+            self._kernel = kernel  # Line conversion function
+            self._pairs = None
+        self._plut = bytearray(32)  # lut and greyscale mode of last refresh
+        self._pgs = None  # Force a build of ._pairs on first use
+        self._sl = sl = min(self.STRIP, height)  # Lines per strip
+        if self.BANDS:
+            self._bl = sl if sl else -(-height // self.BANDS)  # Lines per band
+            nb = -(-height // self._bl)  # No. of bands
+            self._hashes = bytearray(nb * 4)
+            self._chg = bytearray(nb)  # Bands changed in current refresh
+        else:
+            self._hashes = None
+        self._hvalid = False  # Display content matches ._hashes
+        # Hardware scrolling. A subclass sets ._vsflip to enable it: True if the
+        # controller scans rows in the reverse of framebuf order.
+        self._vsflip = None
+        self._vsarea = None  # (first line, no. of lines) set on controller
+        self._voff = 0  # Scroll offset in lines set on controller
+        self._vsnext = None  # Pending (area, offset) to send on next refresh
+        self._gscale = False  # Interpret buffer as index into color LUT
+        self.mode = framebuf.GS4_HMSB
+        self.palette = BoolPalette(self.mode)
+        self._xs = 0  # RAM address of framebuf origin
+        self._ys = 0
+        if lines_per_write < 1 or (width & 1 and lines_per_write > 1):
+            raise ValueError("Invalid lines_per_write.")
+        self._lpw = lines_per_write
+        self._wd = wd = -(-width // 2)  # Bytes per line. Ceiling division for odd widths
+        self.dlist = None
+        if sl:  # Strip mode: drawing methods are replaced with those of a DisplayList
+            self.dlist = dl = DisplayList(width, height, self.mode)
+            for name in DisplayList.PRIMITIVES:
+                setattr(self, name, getattr(dl, name))
+        gc.collect()
+        buf = bytearray((sl or height) * wd)
+        self.mvb = memoryview(buf)
+        self._sy = 0  # Framebuf line held at the start of .mvb
+        if sl:
+            self._sfb = framebuf.FrameBuffer(buf, width, sl, self.mode)
+        super().__init__(buf, width, sl or height, self.mode)
+        # Kernel converts whole bytes: with an odd width the last pixel is not sent.
+        self._linebuf = bytearray(lines_per_write * wd * 2 * self.BPP)
+        self._lock = asyncio.Lock()  # Prevent concurrent refreshes.
+
+    # Write a command.
+    def _wcmd(self, command):
+        self._dc(0)
+        self._cs(0)
+        self._spi.write(command)
+        self._cs(1)
+
+    # Write a command followed by a data arg.
+    def _wcd(self, command, data):
+        self._dc(0)
+        self._cs(0)
+        self._spi.write(command)
+        self._cs(1)
+        self._dc(1)
+        self._cs(0)
+        self._spi.write(data)
+        self._cs(1)
+
+    # Start a memory write: CS is left low for the data which follows.
+    def _start(self, command):
+        self._dc(0)
+        self._cs(0)
+        self._spi.write(command)
+        self._dc(1)
+
+    # Set the controller's address window to framebuf region x0 <= x < x1,
+    # y0 <= y < y1.
+    def _region(self, x0, y0, x1, y1):
+        xs = self._xs
+        ys = self._ys
+        self._wcd(self.CASET, int.to_bytes(((xs + x0) << 16) + xs + x1 - 1, 4, "big"))
+        self._wcd(self.PASET, int.to_bytes(((ys + y0) << 16) + ys + y1 - 1, 4, "big"))
+
+    # Return the table to pass to the kernel, rebuilding the pair table if the
+    # lut or greyscale mode has changed.
+    def _table(self):
+        if self._pgs != self._gscale or self._plut != self.lut:
+            if self._pairs is not None:
+                _mkpairs(self._pairs, self.lut, self._gscale, self.GSXOR)
+            self._plut[:] = self.lut
+            self._pgs = self._gscale
+            self._hvalid = False  # All bands must be sent
+        return self.lut if self._pairs is None else self._pairs
+
+    # Hash each band, flagging those which must be sent. Return the flags or
+    # None if change detection is disabled.
+    def _changed(self):
+        if (hashes := self._hashes) is None:
+            return None
+        force = not self._hvalid
+        self._hvalid = True
+        chg = self._chg
+        buf = self.mvb
+        bb = self._bl * self._wd  # Bytes per band
+        end = len(buf)
+        for n in range(len(chg)):
+            start = n * bb
+            chg[n] = _bhash(hashes, n, buf[start:], min(bb, end - start)) or force
+        return chg
+
+    # Send the changed bands in lines y0 <= y < y1. Each run of changed bands is
+    # written to its own window. If chg is None all lines are sent.
+    def _bands(self, y0, y1, clut, chg):
+        if chg is None:
+            self._fill(y0, y1, clut)
+            return
+        bl = self._bl
+        y = y0
+        while y < y1:
+            ye = min(y1, (y // bl + 1) * bl)  # End of band or segment
+            if chg[y // bl]:
+                while ye < y1 and chg[ye // bl]:  # Extend run
+                    ye = min(y1, ye + bl)
+                self._fill(y, ye, clut)
+            y = ye
+
+    # Return a list of (y0, y1, row) spans covering framebuf lines y0 <= y < y1.
+    # Lines in a span are stored in consecutive controller rows starting at row.
+    def _spans(self, y0, y1):
+        if not (off := self._voff):
+            return ((y0, y1, y0),)
+        t, v = self._vsarea
+        w = t + v - off  # Line stored at the top of the scroll area
+        spans = []
+        for a, b, d in ((0, t, 0), (t, w, off), (w, t + v, off - v), (t + v, self.height, 0)):
+            a = max(a, y0)
+            b = min(b, y1)
+            if a < b:
+                spans.append((a, b, a + d))
+        return spans
+
+    # Write full width framebuf lines y0 <= y < y1 to the display.
+    def _fill(self, y0, y1, clut):
+        for a, b, row in self._spans(y0, y1):
+            self._region(0, row, self.width, row + b - a)
+            self._start(self.RAMWR)
+            self._lines(a, b, clut)
+            self._cs(1)
+
+    # Send any pending scroll commands (DCS VSCRDEF and VSCRSADD).
+    def _vsync(self):
+        if (nxt := self._vsnext) is not None:
+            self._vsnext = None
+            self._vsarea, self._voff = nxt
+            t, v = self._vsarea
+            b = self.height - t - v
+            if self._vsflip:  # Fixed areas are swapped, scrolling is reversed
+                t, b = b, t
+                vsp = t + (v - self._voff) % v
+            else:
+                vsp = t + self._voff
+            self._wcd(b"\x33", int.to_bytes((t << 32) + (v << 16) + b, 6, "big"))
+            self._wcd(b"\x37", int.to_bytes(vsp, 2, "big"))
+
+    # Define framebuf lines tfa <= y < tfa + vsa as the hardware scroll area.
+    # With no args scrolling is cancelled. The display is rewritten on the next
+    # refresh. Lines in the scroll area should span the width of the display.
+    def vscroll_area(self, tfa=0, vsa=None):
+        if self._vsflip is None or self._sl:
+            raise OSError("Hardware scrolling not supported.")
+        if vsa is None:
+            vsa = self.height - tfa
+        if tfa < 0 or vsa < 1 or tfa + vsa > self.height:
+            raise ValueError("Invalid scroll area.")
+        self._vsnext = ((tfa, vsa), 0)
+        self._hvalid = False  # Send all bands
+
+    # Scroll the contents of the scroll area up by n lines (down if n < 0). The
+    # framebuf is scrolled to match and the display is updated on the next
+    # refresh. The caller should redraw the n lines exposed. Return False if
+    # n is too large to scroll: the whole scroll area must then be redrawn.
+    def vscroll(self, n):
+        area, off = self._vsarea, self._voff
+        if self._vsnext is not None:
+            area, off = self._vsnext
+        if area is None:
+            raise ValueError("No scroll area.")
+        t, v = area
+        if abs(n) >= v:
+            return False
+        wd = self._wd
+        mvb = self.mvb
+        # Move blocks of n lines. Source and destination must not overlap.
+        if n > 0:
+            for y in range(t, t + v - n, n):
+                k = min(n, t + v - n - y)
+                mvb[y * wd : (y + k) * wd] = mvb[(y + n) * wd : (y + n + k) * wd]
+        else:
+            m = -n
+            e = t + v
+            while e > t + m:
+                k = min(m, e - t - m)
+                mvb[(e - k) * wd : e * wd] = mvb[(e - k - m) * wd : (e - m) * wd]
+                e -= k
+        self._vsnext = (area, (off + n) % v)
+        if (hashes := self._hashes) is not None:  # Force bands in scroll area to be sent
+            bl = self._bl
+            for n in range(t // bl, (t + v - 1) // bl + 1):
+                hashes[n * 4] ^= 1
+        return True
+
+    # Convert and send framebuf lines y0 <= y < y1 in batches of ._lpw lines.
+    # Caller must have started a memory write.
+    def _lines(self, y0, y1, clut):
+        kernel = self._kernel
+        cm = self._gscale  # color False, greyscale True
+        buf = self.mvb
+        write = self._spi.write
+        wd = self._wd
+        n = self._lpw * wd  # Source bytes per SPI write
+        kb = self._linebuf  # Kernel output
+        lb = memoryview(kb)[: self._lpw * self.width * self.BPP]  # Data to send
+        start = (y0 - self._sy) * wd
+        end = (y1 - self._sy) * wd
+        full = end - (end - start) % n  # End of whole batches
+        for start in range(start, full, n):
+            kernel(kb, buf[start:], clut, n, cm)  # Copy and map colors
+            write(lb)
+        if full < end:  # Part batch
+            n = end - full
+            kernel(kb, buf[full:], clut, n, cm)
+            write(lb[: n * 2 * self.BPP])
+
+    def greyscale(self, gs=None):
+        if gs is not None:
+            self._gscale = gs
+        return self._gscale
+
+    def short_lock(self, v=None):
+        if v is not None:
+            self.lock_mode = v  # If set, user lock is passed to .do_refresh
+        return self.lock_mode
+
+    # Strip mode: replay the display list so that the strip buffer holds framebuf
+    # lines from y. Only columns x0 <= x < x1 need be valid.
+    def _render(self, y, x0=0, x1=None):
+        self._sy = y
+        self.dlist.render(self._sfb, y, y + self._sl, x0, x1)
+
+    def show(self):
+        self._hvalid = False
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._vsync()
+        clut = self._table()
+        if sl := self._sl:
+            for y in range(0, self.height, sl):
+                self._render(y)
+                self._fill(y, min(y + sl, self.height), clut)
+        else:
+            self._fill(0, self.height, clut)
+
+    # Write a rectangular region of the framebuf to the display. The framebuf
+    # holds two pixels per byte so x and w are rounded out to even values.
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0) & ~1
+        x1 = min((x + w + 1) & ~1, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        self._hvalid = False
+        clut = self._table()
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._vsync()
+        if sl := self._sl:
+            for y in range(y0 - y0 % sl, y1, sl):
+                self._render(y, x0, x1)
+                self._rect(x0, max(y0, y), x1, min(y1, y + sl), clut)
+        else:
+            self._rect(x0, y0, x1, y1, clut)
+
+    # Send framebuf region x0 <= x < x1, y0 <= y < y1. x0 must be even.
+    def _rect(self, x0, y0, x1, y1, clut):
+        kernel = self._kernel
+        cm = self._gscale
+        buf = self.mvb
+        wd = self._wd
+        nb = -(-(x1 - x0) // 2)  # Source bytes per line
+        kb = self._linebuf
+        lb = memoryview(kb)[: (x1 - x0) * self.BPP]
+        for a, b, row in self._spans(y0, y1):
+            self._region(x0, row, x1, row + b - a)
+            self._start(self.RAMWR)
+            s0 = (a - self._sy) * wd + x0 // 2
+            for start in range(s0, s0 + (b - a) * wd, wd):  # For each line
+                kernel(kb, buf[start:], clut, nb, cm)  # Copy and map colors
+                self._spi.write(lb)
+            self._cs(1)
+
+    # nanogui apps typically call with no args. ugui and tgui pass split and
+    # may pass a Lock depending on lock_mode. If budget (default .BUDGET) is
+    # nonzero split is ignored: each segment runs for budget μs, or slightly
+    # more as the band or batch of lines in progress is completed.
+    async def do_refresh(self, split=4, elock=None, budget=None):
+        if elock is None:
+            elock = asyncio.Lock()
+        if budget is None:
+            budget = self.BUDGET
+        async with self._lock:
+            if self._sl:
+                await self._strips(elock, budget)
+                return
+            if split < 1:
+                raise ValueError("Invalid do_refresh arg.")
+            ht = self.height
+            split = min(split, ht)
+            clut = self._table()
+            chg = self._changed()
+            # Lines sent between budget checks: a band or whole SPI batches
+            step = self._bl if chg is not None else self._lpw * -(-_STEP // self._lpw)
+            line = 0
+            n = 0  # Segment no.
+            while line < ht:  # For each segment
+                async with elock:
+                    if self._spi_init:  # A callback was passed
+                        self._spi_init(self._spi)  # Bus may be shared
+                    if not line:
+                        self._vsync()
+                    if not (bands := chg is not None or self._voff):  # Write all lines
+                        if not line:
+                            self._region(0, 0, self.width, ht)
+                            self._start(self.RAMWR)
+                        elif self.RAMWRC is None:
+                            self._cs(0)  # Controller continues the write
+                        else:
+                            self._start(self.RAMWRC)
+                    t = ticks_us()
+                    n += 1
+                    end = ht if budget else n * ht // split  # End of segment
+                    while line < end:
+                        nxt = min(line + step, end) if budget else end
+                        if bands:  # Send changed bands
+                            self._bands(line, nxt, clut, chg)
+                        else:
+                            self._lines(line, nxt, clut)
+                        line = nxt
+                        if budget and ticks_diff(ticks_us(), t) >= budget:
+                            break
+                    if not bands:
+                        self._cs(1)  # Allow other tasks to use bus
+                await asyncio.sleep_ms(0)
+
+    # Strip mode refresh: by default each strip is a segment. With a time budget
+    # the task yields after the strip which exhausts it. If change detection is
+    # enabled strips whose hash is unchanged are not sent.
+    async def _strips(self, elock, budget):
+        clut = self._table()
+        force = not self._hvalid
+        self._hvalid = True
+        hashes = self._hashes
+        sl = self._sl
+        ht = self.height
+        t = ticks_us()
+        for y in range(0, ht, sl):
+            ye = min(y + sl, ht)
+            self._render(y)
+            if hashes is None or _bhash(hashes, y // sl, self.mvb, (ye - y) * self._wd) or force:
+                async with elock:
+                    if self._spi_init:  # A callback was passed
+                        self._spi_init(self._spi)  # Bus may be shared
+                    self._fill(y, ye, clut)
+            if not budget or ticks_diff(ticks_us(), t) >= budget:
+                await asyncio.sleep_ms(0)
+                t = ticks_us()
+
+    # Refresh a list of (x, y, w, h) rectangles. The lock is released between
+    # rectangles to allow other tasks to access the bus.
+    async def do_refresh_rects(self, rects, elock=None):
+        if elock is None:
+            elock = asyncio.Lock()
+        async with self._lock:
+            for rect in rects:
+                async with elock:
+                    self.show_rect(*rect)
+                await asyncio.sleep_ms(0)
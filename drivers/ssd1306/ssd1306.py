@@ -23,6 +23,21 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+
+# Compare n bytes of a and b. Return the indices of the first and last bytes
+# which differ as first << 16 | last, or -1 if they are identical.
+@micropython.viper
+def _diff(a: ptr8, b: ptr8, n: int) -> int:
+    i: int = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    if i == n:
+        return -1
+    j: int = n - 1
+    while a[j] == b[j]:
+        j -= 1
+    return (i << 16) | j
+
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
 class SSD1306(framebuf.FrameBuffer):
@@ -36,6 +51,10 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        # Copy of the buffer as last sent. .show sends only the columns of each
+        # page which have changed. Clear ._valid to force a full refresh.
+        self._sent = bytearray(len(self.buffer))
+        self._valid = False
         mode = framebuf.MONO_VLSB
         self.palette = BoolPalette(mode)  # Ensure color compatibility
         super().__init__(self.buffer, self.width, self.height, mode)
@@ -91,9 +110,8 @@ class SSD1306(framebuf.FrameBuffer):
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
 
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
+    # Set the address window to columns x0..x1, pages p0..p1 inclusive.
+    def _window(self, x0, x1, p0, p1):
         if self.width == 64:
             # displays with width of 64 pixels are shifted by 32
             x0 += 32
@@ -102,9 +120,37 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(x0)
         self.write_cmd(x1)
         self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        self.write_cmd(p0)
+        self.write_cmd(p1)
+
+    def show(self):
+        w = self.width
+        buf = memoryview(self.buffer)
+        sent = memoryview(self._sent)
+        if not self._valid:
+            self._valid = True
+            self._window(0, w - 1, 0, self.pages - 1)
+            self.write_data(self.buffer)
+            sent[:] = buf
+            return
+        # Each run of changed pages is sent as one window spanning the changed columns.
+        p = 0
+        while p < self.pages:
+            if (d := _diff(buf[p * w :], sent[p * w :], w)) < 0:
+                p += 1
+                continue
+            x0 = d >> 16
+            x1 = d & 0xFFFF
+            p1 = p + 1
+            while p1 < self.pages and (d := _diff(buf[p1 * w :], sent[p1 * w :], w)) >= 0:
+                x0 = min(x0, d >> 16)
+                x1 = max(x1, d & 0xFFFF)
+                p1 += 1
+            self._window(x0, x1, p, p1 - 1)
+            for n in range(p * w, p1 * w, w):
+                self.write_data(buf[n + x0 : n + x1 + 1])
+                sent[n + x0 : n + x1 + 1] = buf[n + x0 : n + x1 + 1]
+            p = p1
 
 
 class SSD1306_I2C(SSD1306):
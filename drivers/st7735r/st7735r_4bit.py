@@ -132,8 +132,9 @@ class ST7735R(framebuf.FrameBuffer):
         wcd(b'\xe0', b'\x02\x1c\x07\x12\x37\x32\x29\x2d\x29\x25\x2B\x39\x00\x01\x03\x10')  # GMCTRP1 Gamma
         wcd(b'\xe1', b'\x03\x1d\x07\x06\x2E\x2C\x29\x2D\x2E\x2E\x37\x3F\x00\x00\x02\x10')  # GMCTRN1
 
-        wcd(b'\x2a', int.to_bytes(self.width, 4, 'big'))  # CASET column address 0 start, 160 end
-        wcd(b'\x2b', int.to_bytes(self.height, 4, 'big'))  # RASET
+        self._window = (int.to_bytes(self.width, 4, 'big'), int.to_bytes(self.height, 4, 'big'))
+        wcd(b'\x2a', self._window[0])  # CASET column address 0 start, 160 end
+        wcd(b'\x2b', self._window[1])  # RASET
 
         cmd(b'\x13')  # NORON
         sleep_ms(10)
@@ -156,3 +157,34 @@ class ST7735R(framebuf.FrameBuffer):
             _lcopy(lb, buf[start :], clut, wd)  # Copy and map colors
             self._spi.write(lb)
         self._cs(1)
+
+    # Write a rectangular region of the framebuf to the display. x is rounded
+    # down and w up to an even number of pixels. As in .show lines are sent in
+    # reverse order so the row window is reflected.
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0) & ~1
+        x1 = min((x + w + 1) & ~1, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        clut = ST7735R.lut
+        wd = self.width // 2
+        nb = (x1 - x0) // 2  # Source bytes per line
+        lb = memoryview(self._linebuf)[: nb * 4]
+        s0 = x0 // 2
+        buf = self._mvb
+        ro = self.height  # Reflected row origin
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._wcd(b'\x2a', int.to_bytes((x0 << 16) + x1 - 1, 4, 'big'))  # CASET
+        self._wcd(b'\x2b', int.to_bytes(((ro - y1) << 16) + ro - y0 - 1, 4, 'big'))  # RASET
+        self._wcmd(b'\x2c')  # RAMWR
+        self._dc(1)
+        self._cs(0)
+        for start in range(s0 + (y1 - 1) * wd, s0 + (y0 - 1) * wd, -wd):  # For each line
+            _lcopy(lb, buf[start :], clut, nb)  # Copy and map colors
+            self._spi.write(lb)
+        self._cs(1)
+        self._wcd(b'\x2a', self._window[0])  # Restore full screen window
+        self._wcd(b'\x2b', self._window[1])
@@ -16,12 +16,8 @@
 # SPI bus: default mode. Driver performs no read cycles.
 # Datasheet table 6 p44 scl write cycle 16ns == 62.5MHz
 
-from time import sleep_ms  # , ticks_us, ticks_diff
-import framebuf
-import gc
-import micropython
-import asyncio
-from drivers.boolpalette import BoolPalette
+from time import sleep_ms
+from drivers.spidisplay import AsyncSPIDisplay
 
 # User orientation constants
 # Waveshare Pico res touch defaults to portrait. Requires PORTRAIT for landscape orientation.
@@ -41,29 +37,9 @@ ADAFRUIT_1_9 = (35, 0, PORTRAIT)  #  320x170 TFT https://www.adafruit.com/produc
 # inv: True if color mode is inverted, False normal (default)
 
 
-@micropython.viper
-def _lcopy(dest: ptr16, source: ptr8, lut: ptr16, length: int, gscale: bool):
-    # rgb565 - 16bit/pixel
-    n: int = 0
-    x: int = 0
-    while length:
-        c = source[x]
-        p = c >> 4  # current pixel
-        q = c & 0x0F  # next pixel
-        if gscale:
-            dest[n] = (p >> 1 | p << 4 | p << 9 | ((p & 0x01) << 15)) ^ 0xFFFF
-            n += 1
-            dest[n] = (q >> 1 | q << 4 | q << 9 | ((q & 0x01) << 15)) ^ 0xFFFF
-        else:
-            dest[n] = lut[p]  # current pixel
-            n += 1
-            dest[n] = lut[q]  # next pixel
-        n += 1
-        x += 1
-        length -= 1
-
-
-class ST7789(framebuf.FrameBuffer):
+class ST7789(AsyncSPIDisplay):
+    RAMWRC = b"\x3c"  # Write memory continue
+    GSXOR = 0xFFFF  # Color must be inverted on this controller
 
     lut = bytearray(0xFF for _ in range(32))  # set all colors to BLACK
 
@@ -87,28 +63,15 @@ class ST7789(framebuf.FrameBuffer):
         disp_mode=LANDSCAPE,
         init_spi=False,
         display=GENERIC,
+        lines_per_write=1,
     ):
         if not 0 <= disp_mode <= 7:
             raise ValueError("Invalid display mode:", disp_mode)
-        self._spi = spi  # Clock cycle time for write 16ns 62.5MHz max (read is 150ns)
-        self._rst = rst  # Pins
-        self._dc = dc
-        self._cs = cs
-        self.lock_mode = False  # If set, user lock is passed to .do_refresh
-        self.height = height  # Required by Writer class
-        self.width = width
+        # Clock cycle time for write 16ns 62.5MHz max (read is 150ns)
+        super().__init__(spi, cs, dc, height, width, init_spi, lines_per_write)
+        self._rst = rst
         self._offset = display[:2]  # display arg is (x, y, orientation)
         orientation = display[2]  # where x, y is the RAM offset
-        self._spi_init = init_spi  # Possible user callback
-        self._lock = asyncio.Lock()
-        self._gscale = False  # Interpret buffer as index into color LUT
-        self.mode = framebuf.GS4_HMSB  # Use 4bit greyscale.
-        self.palette = BoolPalette(self.mode)
-        gc.collect()
-        buf = bytearray(height * -(-width // 2))  # Ceiling division for odd widths
-        self.mvb = memoryview(buf)
-        super().__init__(buf, width, height, self.mode)
-        self._linebuf = bytearray(self.width * 2)  # 16 bit color out
         self._init(disp_mode, orientation, display[3:])
         self.show()
 
@@ -123,24 +86,6 @@ class ST7789(framebuf.FrameBuffer):
             self._rst(1)
             sleep_ms(1)
 
-    # Write a command, a bytes instance (in practice 1 byte).
-    def _wcmd(self, buf):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(buf)
-        self._cs(1)
-
-    # Write a command followed by a data arg.
-    def _wcd(self, c, d):
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(c)
-        self._cs(1)
-        self._dc(1)
-        self._cs(0)
-        self._spi.write(d)
-        self._cs(1)
-
     # Initialise the hardware. Blocks 163ms. Adafruit have various sleep delays
     # where I can find no requirement in the datasheet. I removed them with
     # other redundant code.
@@ -196,93 +141,21 @@ class ST7789(framebuf.FrameBuffer):
             xoff = self._offset[1]  # x and y transposed
             yoff = self._offset[0]
             xs = xoff
-            xe = wwd + xoff - 1
             ys = yoff  # y start
-            ye = wht + yoff - 1  # y end
             if mode & reflect:
                 ys = rwd - wht - yoff
-                ye = rwd - yoff - 1
             if mode & usd:
                 xs = rht - wwd - xoff
-                xe = rht - xoff - 1
         else:  # LANDSCAPE
             xoff = self._offset[0]
             yoff = self._offset[1]
             xs = xoff
-            xe = wwd + xoff - 1
             ys = yoff  # y start
-            ye = wht + yoff - 1  # y end
             if mode & usd:
                 ys = rht - wht - yoff
-                ye = rht - yoff - 1
             if mode & reflect:
                 xs = rwd - wwd - xoff
-                xe = rwd - xoff - 1
-
-        # Col address set.
-        self._wcd(b"\x2a", int.to_bytes((xs << 16) + xe, 4, "big"))
-        # Row address set
-        self._wcd(b"\x2b", int.to_bytes((ys << 16) + ye, 4, "big"))
-
-    def greyscale(self, gs=None):
-        if gs is not None:
-            self._gscale = gs
-        return self._gscale
-
-    # @micropython.native # Made virtually no difference to timing.
-    def show(self):  # Blocks for 83ms @60MHz SPI
-        # Blocks for 60ms @30MHz SPI on TTGO in PORTRAIT mode
-        # Blocks for 46ms @30MHz SPI on TTGO in LANDSCAPE mode
-        # ts = ticks_us()
-        clut = ST7789.lut
-        wd = -(-self.width // 2)  # Ceiling division for odd number widths
-        end = self.height * wd
-        lb = memoryview(self._linebuf)
-        cm = self._gscale  # color False, greyscale True
-        buf = self.mvb
-        if self._spi_init:  # A callback was passed
-            self._spi_init(self._spi)  # Bus may be shared
-        self._dc(0)
-        self._cs(0)
-        self._spi.write(b"\x2c")  # RAMWR
-        self._dc(1)
-        for start in range(0, end, wd):
-            _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-            self._spi.write(lb)
-        self._cs(1)
-        # print(ticks_diff(ticks_us(), ts))
-
-    def short_lock(self, v=None):
-        if v is not None:
-            self.lock_mode = v  # If set, user lock is passed to .do_refresh
-        return self.lock_mode
 
-    # nanogui apps typically call with no args. ugui and tgui pass split and
-    # may pass a Lock depending on lock_mode
-    async def do_refresh(self, split=4, elock=None):
-        if elock is None:
-            elock = asyncio.Lock()
-        async with self._lock:
-            lines, mod = divmod(self.height, split)  # Lines per segment
-            if mod:
-                raise ValueError("Invalid do_refresh arg.")
-            clut = ST7789.lut
-            wd = -(-self.width // 2)
-            lb = memoryview(self._linebuf)
-            cm = self._gscale  # color False, greyscale True
-            buf = self.mvb
-            line = 0
-            for n in range(split):
-                async with elock:
-                    if self._spi_init:  # A callback was passed
-                        self._spi_init(self._spi)  # Bus may be shared
-                    self._dc(0)
-                    self._cs(0)
-                    self._spi.write(b"\x3c" if n else b"\x2c")  # RAMWR/Write memory continue
-                    self._dc(1)
-                    for start in range(wd * line, wd * (line + lines), wd):
-                        _lcopy(lb, buf[start:], clut, wd, cm)  # Copy and map colors
-                        self._spi.write(lb)
-                    line += lines
-                    self._cs(1)
-                await asyncio.sleep(0)
+        self._xs = xs  # RAM address of framebuf origin
+        self._ys = ys
+        self._region(0, 0, wwd, wht)
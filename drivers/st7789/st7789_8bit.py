@@ -208,10 +208,14 @@ class ST7789(framebuf.FrameBuffer):
                 xs = rwd - wwd - xoff
                 xe = rwd - xoff - 1
 
-        # Col address set.
-        self._wcd(b"\x2a", int.to_bytes((xs << 16) + xe, 4, "big"))
-        # Row address set
-        self._wcd(b"\x2b", int.to_bytes((ys << 16) + ye, 4, "big"))
+        self._xs = xs  # RAM address of framebuf origin
+        self._ys = ys
+        self._window = (
+            int.to_bytes((xs << 16) + xe, 4, "big"),
+            int.to_bytes((ys << 16) + ye, 4, "big"),
+        )
+        self._wcd(b"\x2a", self._window[0])  # Col address set.
+        self._wcd(b"\x2b", self._window[1])  # Row address set
 
     def show(self):  # Blocks for 83ms @60MHz SPI
         # Blocks for 60ms @30MHz SPI on TTGO in PORTRAIT mode
@@ -233,6 +237,36 @@ class ST7789(framebuf.FrameBuffer):
         self._cs(1)
         # print(ticks_diff(ticks_us(), ts))
 
+    # Write a rectangular region of the framebuf to the display.
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        wd = self.width
+        nb = x1 - x0  # Pixels per line
+        lb = memoryview(self._linebuf)[: nb * 2]
+        buf = self.mvb
+        xs = self._xs
+        ys = self._ys
+        if self._spi_init:  # A callback was passed
+            self._spi_init(self._spi)  # Bus may be shared
+        self._wcd(b"\x2a", int.to_bytes(((xs + x0) << 16) + xs + x1 - 1, 4, "big"))
+        self._wcd(b"\x2b", int.to_bytes(((ys + y0) << 16) + ys + y1 - 1, 4, "big"))
+        self._dc(0)
+        self._cs(0)
+        self._spi.write(b"\x2c")  # RAMWR
+        self._dc(1)
+        s0 = y0 * wd + x0
+        for start in range(s0, s0 + (y1 - y0) * wd, wd):
+            _lcopy(lb, buf[start:], nb)  # Copy and map colors
+            self._spi.write(lb)
+        self._cs(1)
+        self._wcd(b"\x2a", self._window[0])  # Restore full screen window
+        self._wcd(b"\x2b", self._window[1])
+
     def short_lock(self, v=None):
         if v is not None:
             self.lock_mode = v  # If set, user lock is passed to .do_refresh
@@ -265,3 +299,14 @@ class ST7789(framebuf.FrameBuffer):
                     line += lines
                     self._cs(1)
                 await asyncio.sleep(0)
+
+    # Refresh a list of (x, y, w, h) rectangles. The lock is released between
+    # rectangles to allow other tasks to access the bus.
+    async def do_refresh_rects(self, rects, elock=None):
+        if elock is None:
+            elock = asyncio.Lock()
+        async with self._lock:
+            for rect in rects:
+                async with elock:
+                    self.show_rect(*rect)
+                await asyncio.sleep_ms(0)
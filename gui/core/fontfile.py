@@ -0,0 +1,299 @@
+# fontfile.py Random access binary font files for Writer and CWriter
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# A FontFile is a drop-in replacement for a font_to_py Python font. Glyphs are
+# read from the file on demand into a fixed size LRU cache, so large Unicode
+# fonts may be used without freezing and with bounded RAM use. Usage:
+# from gui.core.fontfile import FontFile
+# font = FontFile("/fonts/cjk24.bin", cache=48)
+# wri = CWriter(ssd, font, GREEN, BLACK)
+# Files are created from font_to_py Python fonts (on a PC or on the target):
+# import gui.fonts.font14 as font14
+# from gui.core.fontfile import convert
+# convert(font14, "font14.bin")
+# Passing rle=True to convert compresses glyphs, typically by a factor of 2.5 for
+# large fonts. Compressed glyphs are expanded into the cache when first used.
+
+# File format. All values little-endian.
+# Header:
+#   4s magic b"MPF1"
+#   B height, B baseline, B max_width, B flags (b0 hmap, b1 reverse, b2 monospaced,
+#     b3 compressed glyphs present)
+#   H number of index entries, H min_ch, H max_ch
+#   B default glyph width, B reserved, I default glyph offset
+# Index: one 8 byte entry per glyph, sorted by character code:
+#   H code, B width, B flags (b0 compressed), I offset of glyph from start of file
+# Glyph data: horizontally mapped, each row padded to a byte boundary.
+# Compressed glyph: H length in bytes followed by a stream of 4-bit nibbles.
+# These are run lengths of alternating unlit and lit pixels, scanning the glyph
+# row by row (ignoring padding) and starting with unlit pixels. Pixels are read
+# in the bit order of the font: LS bit first if the reverse flag is set. Values 0-14 are
+# a run length. 15 is followed by 3-bit groups, least significant first, with
+# b3 set if another group follows: the run length is 15 plus their value.
+# Unlit pixels after the last lit run are omitted. A final odd nibble is 0.
+
+import struct
+
+try:
+    import micropython
+except ImportError:  # Converting on a PC
+
+    class micropython:
+        native = staticmethod(lambda f: f)
+
+
+_MAGIC = b"MPF1"
+_HFMT = "<4sBBBBHHHBxI"
+_HSIZE = 20
+_EFMT = "<HBBI"
+_ESIZE = 8
+
+
+# Bytes occupied by a glyph of a given width
+def _gsize(width, height):
+    return ((width - 1) // 8 + 1) * height
+
+
+# Expand a compressed glyph of nbytes in src into dest. rev selects LS bit first.
+@micropython.native
+def _expand(dest, src, nbytes: int, width: int, rev: int):
+    gbytes = (width - 1) // 8 + 1
+    for i in range(len(dest)):
+        dest[i] = 0
+    row = 0  # Offset of current row in dest
+    col = 0
+    ink = 0
+    n = 0  # Nibble index
+    end = nbytes * 2
+    while n < end:
+        r = src[n >> 1] & 0x0F if n & 1 else src[n >> 1] >> 4
+        n += 1
+        if r == 15:  # Long run
+            r = 0
+            shift = 0
+            nib = 8
+            while nib & 8:
+                nib = src[n >> 1] & 0x0F if n & 1 else src[n >> 1] >> 4
+                n += 1
+                r |= (nib & 7) << shift
+                shift += 3
+            r += 15
+        if ink:
+            while r:
+                dest[row + (col >> 3)] |= 1 << (col & 7) if rev else 0x80 >> (col & 7)
+                col += 1
+                if col == width:
+                    col = 0
+                    row += gbytes
+                r -= 1
+        else:
+            col += r
+            while col >= width:
+                col -= width
+                row += gbytes
+        ink ^= 1
+
+
+class FontFile:
+    # Glyph buffers are reused when the cache is full, so clients must not
+    # retain references to glyphs returned by get_ch.
+    static = False
+
+    def __init__(self, filename, cache=32):
+        if cache < 1:
+            raise ValueError("Cache must hold at least one glyph.")
+        self._f = f = open(filename, "rb")
+        hdr = struct.unpack(_HFMT, f.read(_HSIZE))
+        if hdr[0] != _MAGIC:
+            raise ValueError("Not a font file.")
+        _, self._ht, self._bl, self._mw, self._flags, self._n, self._lo, self._hi = hdr[:8]
+        self._ebuf = bytearray(_ESIZE)
+        self._gs = gs = _gsize(self._mw, self._ht)  # Max glyph size
+        if self._flags & 8:  # Compressed data is read into a scratch buffer
+            self._lbuf = bytearray(2)
+            self._rbuf = memoryview(bytearray(gs))
+        dwidth, doffs = hdr[8:]
+        buf = bytearray(_gsize(dwidth, self._ht))
+        f.seek(doffs)
+        f.readinto(buf)
+        self._default = (memoryview(buf), self._ht, dwidth)
+        # LRU cache of glyphs held in a single preallocated buffer
+        self._size = cache
+        self._mv = memoryview(bytearray(cache * gs))
+        self._index = {}  # char: slot no.
+        self._chars = [None] * cache
+        self._glyphs = [None] * cache
+        self._ticks = [0] * cache  # Time of last use
+        self._tick = 0
+        self.reads = 0  # Number of glyph reads
+
+    def close(self):
+        self._f.close()
+
+    def height(self):
+        return self._ht
+
+    def baseline(self):
+        return self._bl
+
+    def max_width(self):
+        return self._mw
+
+    def hmap(self):
+        return bool(self._flags & 1)
+
+    def reverse(self):
+        return bool(self._flags & 2)
+
+    def monospaced(self):
+        return bool(self._flags & 4)
+
+    def min_ch(self):
+        return self._lo
+
+    def max_ch(self):
+        return self._hi
+
+    # Binary search of the index on file. Return (width, flags, offset) or None.
+    def _find(self, code):
+        f = self._f
+        e = self._ebuf
+        lo = 0
+        hi = self._n - 1
+        while lo <= hi:
+            m = (lo + hi) >> 1
+            f.seek(_HSIZE + m * _ESIZE)
+            f.readinto(e)
+            c, width, flags, offs = struct.unpack(_EFMT, e)
+            if c == code:
+                return width, flags, offs
+            if c < code:
+                lo = m + 1
+            else:
+                hi = m - 1
+        return None
+
+    # Advance width of a glyph without reading its bitmap
+    def width(self, ch):
+        if (n := self._index.get(ch)) is not None:
+            return self._glyphs[n][2]
+        if (e := self._find(ord(ch))) is None:
+            return self._default[2]
+        return e[0]
+
+    def get_ch(self, ch):
+        self._tick += 1
+        if (n := self._index.get(ch)) is not None:
+            self._ticks[n] = self._tick
+            return self._glyphs[n]
+        if (e := self._find(ord(ch))) is None:
+            return self._default
+        width, flags, offs = e
+        if (n := len(self._index)) >= self._size:  # Full: evict LRU
+            ticks = self._ticks
+            n = min(range(self._size), key=lambda x: ticks[x])
+            del self._index[self._chars[n]]
+        nbytes = _gsize(width, self._ht)
+        start = n * self._gs
+        buf = self._mv[start : start + nbytes]
+        f = self._f
+        f.seek(offs)
+        if flags & 1:  # Compressed
+            f.readinto(self._lbuf)
+            nc = self._lbuf[0] | self._lbuf[1] << 8
+            src = self._rbuf[:nc]
+            f.readinto(src)
+            _expand(buf, src, nc, width, self._flags & 2)
+        else:
+            f.readinto(buf)
+        self.reads += 1
+        glyph = (buf, self._ht, width)
+        self._index[ch] = n
+        self._chars[n] = ch
+        self._glyphs[n] = glyph
+        self._ticks[n] = self._tick
+        return glyph
+
+
+# Run lengths as nibbles
+def _runs(nibs, r):
+    if r < 15:
+        nibs.append(r)
+        return
+    nibs.append(15)
+    r -= 15
+    while True:
+        v = r & 7
+        r >>= 3
+        nibs.append(v | 8 if r else v)
+        if not r:
+            return
+
+
+def _compress(glyph, width, height, rev):
+    gbytes = (width - 1) // 8 + 1
+    nibs = []
+    ink = 0
+    run = 0
+    for row in range(0, height * gbytes, gbytes):
+        for col in range(width):
+            bit = col & 7 if rev else 7 - (col & 7)
+            if (glyph[row + (col >> 3)] >> bit & 1) == ink:
+                run += 1
+            else:
+                _runs(nibs, run)
+                ink ^= 1
+                run = 1
+    if ink:
+        _runs(nibs, run)
+    if len(nibs) & 1:
+        nibs.append(0)
+    data = bytes(nibs[n] << 4 | nibs[n + 1] for n in range(0, len(nibs), 2))
+    return len(data).to_bytes(2, "little") + data
+
+
+# Write a font_to_py Python font to a binary font file. Characters whose glyph
+# is identical to the default glyph are omitted: they render identically. If
+# rle is set glyphs are compressed where this saves space.
+def convert(font, filename, rle=False):
+    if not font.hmap():
+        raise ValueError("Font must be horizontally mapped.")
+    ht = font.height()
+    lo = font.min_ch()
+    hi = font.max_ch()
+    if hi > 0xFFFF:  # Codes are stored as 16 bits
+        raise ValueError("Characters above U+FFFF are not supported.")
+    dglyph, _, dwidth = font.get_ch(chr(hi + 1))  # Missing chars map to default
+    dglyph = bytes(dglyph)
+    entries = []
+    data = [dglyph]
+    offs = _HSIZE + len(dglyph)  # Data offset less size of index
+    for code in range(lo, hi + 1):
+        glyph, _, width = font.get_ch(chr(code))
+        glyph = bytes(glyph[: _gsize(width, ht)])
+        if width == dwidth and glyph == dglyph:
+            continue
+        flags = 0
+        if rle and len(c := _compress(glyph, width, ht, font.reverse())) < len(glyph):
+            glyph = c
+            flags = 1
+        entries.append((code, width, flags, offs))
+        data.append(glyph)
+        offs += len(glyph)
+    isize = len(entries) * _ESIZE
+    bl = font.baseline() if hasattr(font, "baseline") else ht
+    flags = 1 | (2 if font.reverse() else 0)
+    if hasattr(font, "monospaced") and font.monospaced():
+        flags |= 4
+    if any(e[2] for e in entries):
+        flags |= 8
+    with open(filename, "wb") as f:
+        mw = font.max_width()
+        n = len(entries)
+        f.write(struct.pack(_HFMT, _MAGIC, ht, bl, mw, flags, n, lo, hi, dwidth, _HSIZE + isize))
+        for code, width, gflags, o in entries:
+            f.write(struct.pack(_EFMT, code, width, gflags, o + isize))
+        for glyph in data:
+            f.write(glyph)
@@ -7,7 +7,9 @@
 import asyncio
 import gc
 from array import array
+import framebuf
 import sys
+from time import ticks_us, ticks_diff
 
 from gui.core.colors import *
 
@@ -54,6 +56,203 @@ class DummyTouch:
         return False
 
 
+# Bytes required for a w*h region of a framebuf of given mode. None if unsupported.
+def bufsize(mode, w, h):
+    if mode == framebuf.GS4_HMSB:
+        return ((w + 1) >> 1) * h
+    if mode == framebuf.GS8:
+        return w * h
+    if mode == framebuf.RGB565:
+        return w * h * 2
+    return None
+
+
+# Accumulates bounding boxes of framebuf regions modified since the last
+# physical refresh. Boxes are stored as [x0, y0, x1, y1] with exclusive x1, y1.
+# Overlapping boxes are merged; if too many accrue the whole screen is dirty.
+class Dirty:
+    def __init__(self, width, height, maxrects=8):
+        self.width = width
+        self.height = height
+        self.maxrects = maxrects
+        self.rects = []
+        self.full = True  # Initial refresh is of the entire screen
+
+    def add(self, x, y, w, h):
+        if self.full:
+            return
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return  # Off screen
+        rects = self.rects
+        merged = True
+        while merged:  # A grown box may now overlap others: merge until none do
+            merged = False
+            for r in rects:
+                if x0 <= r[2] and x1 >= r[0] and y0 <= r[3] and y1 >= r[1]:  # Overlap or abut
+                    x0 = min(r[0], x0)
+                    y0 = min(r[1], y0)
+                    x1 = max(r[2], x1)
+                    y1 = max(r[3], y1)
+                    rects.remove(r)
+                    merged = True
+                    break
+        if len(rects) >= self.maxrects:
+            self.invalidate()
+        else:
+            rects.append([x0, y0, x1, y1])
+
+    def invalidate(self):  # Whole screen needs refreshing
+        self.full = True
+        self.rects.clear()
+
+    # Return list of (x, y, w, h) regions and clear. None means entire screen.
+    def get(self):
+        if self.full:
+            self.full = False
+            return None
+        res = [(r[0], r[1], r[2] - r[0], r[3] - r[1]) for r in self.rects]
+        self.rects.clear()
+        return res
+
+
+# Opt-in instrumentation. Durations in μs are stored in a fixed size ring
+# buffer for each key. Keys are widget class names for redraws, "refresh" for
+# physical refresh, "poll" for touch acquisition and "cb <class>" for touch
+# callbacks. Physical refresh time includes any yields during do_refresh.
+class Profiler:
+    def __init__(self, size=16):
+        self.size = size
+        self.rings = {}  # key: [array, next index, total count]
+
+    def add(self, key, dt):
+        if (ring := self.rings.get(key)) is None:
+            ring = [array("I", (0 for _ in range(self.size))), 0, 0]
+            self.rings[key] = ring
+        ring[0][ring[1]] = dt
+        ring[1] = (ring[1] + 1) % self.size
+        ring[2] += 1
+
+    # Return (total count, mean, max) for a key over the most recent samples.
+    def stats(self, key):
+        if (ring := self.rings.get(key)) is None:
+            return (0, 0, 0)
+        n = min(ring[2], self.size)
+        buf = ring[0][:n]
+        return (ring[2], sum(buf) // n, max(buf))
+
+    def keys(self):
+        return self.rings.keys()
+
+    def clear(self):
+        self.rings.clear()
+
+    def summary(self):  # Print stats in descending order of mean duration
+        res = sorted(((self.stats(k), k) for k in self.rings), key=lambda x: x[0][1], reverse=True)
+        for (n, mean, mx), k in res:
+            print(f"{k:<16} n {n:6d} mean {mean:7d}μs max {mx:7d}μs")
+
+
+# A string rendered once into a 1-bit FrameBuffer. Redrawing is a single palette
+# blit so colors may change without re-rendering. Used by widgets which opt in
+# to text caching by setting e.g. Label.cache = True.
+class TextImage:
+    def __init__(self):
+        self.fb = None
+        self.text = None
+        self.font = None
+        self.width = 0
+
+    # Return a FrameBuffer containing txt in writer's font or None if txt can't
+    # be cached. Re-renders only if the text or font has changed.
+    def get(self, writer, txt):
+        if txt == self.text and writer.font is self.font:
+            return self.fb
+        self.text = txt
+        self.font = font = writer.font
+        self.fb = None
+        if not txt or "\n" in txt or "\t" in txt:
+            return None
+        self.width = wd = writer.stringlen(txt)
+        ht = writer.height
+        fb = framebuf.FrameBuffer(bytearray(((wd + 7) >> 3) * ht), wd, ht, framebuf.MONO_HLSB)
+        col = 0
+        for c in txt:
+            glyph, gh, gw = font.get_ch(c)
+            fb.blit(framebuf.FrameBuffer(bytearray(glyph), gw, gh, writer.map), col, 0)
+            col += gw
+        self.fb = fb
+        return fb
+
+
+# Caches the output of widgets' show methods for Display(record=True). While a
+# widget is shown the driver's drawing methods are replaced by functions which
+# also record each call in the widget's DisplayList. A forced redraw of a Screen
+# replays the list of any widget which has not changed.
+class Recorder:
+    def __init__(self):
+        from drivers.displaylist import DisplayList
+
+        self._dlc = DisplayList
+        self._dl = None  # List being recorded
+        self._ok = True  # Recording is valid
+        self._orig = [(name, getattr(ssd, name)) for name in DisplayList.PRIMITIVES]
+        self._tees = [(name, self._tee(name, fn)) for name, fn in self._orig]
+
+    def _tee(self, name, fn):
+        if name == "pixel":
+
+            def tee(x, y, *c):
+                if c:  # Not a read
+                    self._dl.pixel(x, y, *c)
+                return fn(x, y, *c)
+
+        elif name == "scroll":
+
+            def tee(*args):
+                self._ok = False  # Framebuf contents have moved
+                return fn(*args)
+
+        else:
+
+            def tee(*args):
+                getattr(self._dl, name)(*args)
+                return fn(*args)
+
+        return tee
+
+    # Run obj.show() recording its output.
+    def record(self, obj):
+        if not obj.recordable:
+            obj.show()
+            return
+        if (dl := obj._dl) is None:
+            dl = self._dlc(ssd.width, ssd.height, getattr(ssd, "mode", 0))
+        dl.clear()
+        self._dl = dl
+        self._ok = True
+        for name, fn in self._tees:
+            setattr(ssd, name, fn)
+        try:
+            obj.show()
+        finally:
+            for name, fn in self._orig:
+                setattr(ssd, name, fn)
+            self._dl = None
+        obj._dl = dl if self._ok and len(dl) else None
+
+    # Redraw obj from its recording. Return False if there is none.
+    def replay(self, obj):
+        if (dl := obj._dl) is None:
+            return False
+        dl.replay(ssd)
+        display.mark(*dl.bounds())
+        return True
+
+
 # Wrapper for global ssd object providing framebuf compatible methods.
 # Populates globals display, touch and ssd.
 class Display:
@@ -83,7 +282,7 @@ class Display:
             ),
         )
 
-    def __init__(self, objssd, objtouch=None, arbitrate=None):
+    def __init__(self, objssd, objtouch=None, arbitrate=None, partial=False, record=False):
         global display, ssd, touch
         ssd = objssd
         display = self
@@ -92,23 +291,59 @@ class Display:
         self.height = ssd.height
         self.width = ssd.width
         self._is_grey = False  # Not greyed-out
+        # Partial refresh requires driver support for writing a rectangular region.
+        partial = partial and hasattr(ssd, "show_rect")
+        self._dirty = Dirty(self.width, self.height) if partial else None
+        self.recorder = Recorder() if record else None
+
+    # Record a modified region for partial refresh. Called by primitives. Application
+    # code which draws directly to ssd should call this: no args means whole screen.
+    def mark(self, x=None, y=None, w=0, h=0):
+        Screen.redraw.set()  # Wake refresh task if waiting on idle
+        if (d := self._dirty) is not None:
+            if x is None:
+                d.invalidate()
+            else:
+                d.add(x, y, w, h)
+
+    # Return modified regions since last call. None signifies entire screen.
+    def dirty(self):
+        return None if self._dirty is None else self._dirty.get()
 
-    def print_centred(self, writer, x, y, text, fgcolor=None, bgcolor=None, invert=False):
+    def print_centred(
+        self, writer, x, y, text, fgcolor=None, bgcolor=None, invert=False, image=None
+    ):
         sl = writer.stringlen(text)
-        writer.set_textpos(ssd, y - writer.height // 2, x - sl // 2)
-        if self._is_grey:
-            fgcolor = color_map[GREY_OUT]
-        writer.setcolor(fgcolor, bgcolor)
-        writer.printstring(text, invert)
-        writer.setcolor()  # Restore defaults
+        x -= sl // 2
+        self.print_left(writer, x, y - writer.height // 2, text, fgcolor, bgcolor, invert, image)
 
-    def print_left(self, writer, x, y, txt, fgcolor=None, bgcolor=None, invert=False):
-        writer.set_textpos(ssd, y, x)
+    # If a TextImage is passed, single line text which fits the screen is drawn
+    # from (and if necessary rendered into) the image.
+    def print_left(self, writer, x, y, txt, fgcolor=None, bgcolor=None, invert=False, image=None):
         if self._is_grey:
             fgcolor = color_map[GREY_OUT]
+        if image is not None and (fb := image.get(writer, txt)) is not None:
+            if 0 <= x and x + image.width <= self.width:
+                fg = writer.def_fgcolor if fgcolor is None else fgcolor
+                bg = writer.def_bgcolor if bgcolor is None else bgcolor
+                palette = ssd.palette
+                palette.bg(fg if invert else bg)
+                palette.fg(bg if invert else fg)
+                ssd.blit(fb, x, y, -1, palette)
+                self.mark(x, y, image.width, writer.height)
+                return
+        writer.set_textpos(ssd, y, x)
         writer.setcolor(fgcolor, bgcolor)
         writer.printstring(txt, invert)
         writer.setcolor()  # Restore defaults
+        if self._dirty is None:  # No region needed: just wake the refresh task
+            self.mark()
+        else:
+            row, col = writer.set_textpos(ssd)  # Position after printing
+            if row == y:  # Single line
+                self.mark(x, y, col - x, writer.height)
+            else:
+                self.mark(0, y, self.width, row - y + writer.height)
 
     # Greying out has only one option given limitation of 4-bit display driver
     # It would be possible to do better with RGB565 but would need inverse transformation
@@ -127,47 +362,64 @@ class Display:
     # Clear screen.
     def clr_scr(self):
         ssd.fill_rect(0, 0, self.width, self.height, color_map[BG])
+        self.mark()
 
     def rect(self, x1, y1, w, h, color):
         ssd.rect(x1, y1, w, h, self._getcolor(color))
+        self.mark(x1, y1, w, h)
 
     def fill_rect(self, x1, y1, w, h, color):
         ssd.fill_rect(x1, y1, w, h, self._getcolor(color))
+        self.mark(x1, y1, w, h)
 
     def vline(self, x, y, l, color):
         ssd.vline(x, y, l, self._getcolor(color))
+        self.mark(x, y, 1, l)
 
     def hline(self, x, y, l, color):
         ssd.hline(x, y, l, self._getcolor(color))
+        self.mark(x, y, l, 1)
 
     def line(self, x1, y1, x2, y2, color):
         ssd.line(x1, y1, x2, y2, self._getcolor(color))
+        self.mark(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
 
     def circle(self, x0, y0, r, color):  # Draw circle (maybe grey)
         color = self._getcolor(color)
-        ssd.ellipse(int(x0), int(y0), int(r), int(r), color)
+        x0, y0, r = int(x0), int(y0), int(r)
+        ssd.ellipse(x0, y0, r, r, color)
+        self.mark(x0 - r, y0 - r, 2 * r + 1, 2 * r + 1)
 
     def fillcircle(self, x0, y0, r, color):  # Draw filled circle
         color = self._getcolor(color)
-        ssd.ellipse(int(x0), int(y0), int(r), int(r), color, True)
+        x0, y0, r = int(x0), int(y0), int(r)
+        ssd.ellipse(x0, y0, r, r, color, True)
+        self.mark(x0 - r, y0 - r, 2 * r + 1, 2 * r + 1)
 
     def clip_rect(self, x, y, w, h, color):
         ssd.poly(0, 0, self.crect(x, y, w, h), self._getcolor(color))
+        self.mark(x, y, w + 1, h + 1)
 
     def fill_clip_rect(self, x, y, w, h, color):
         ssd.poly(0, 0, self.crect(x, y, w, h), self._getcolor(color), True)
+        self.mark(x, y, w + 1, h + 1)
 
 
 class Screen:
     do_gc = True  # Allow user to take control of GC
+    idle_wait = False  # Refresh task sleeps until the framebuf is modified
+    redraw = asyncio.Event()  # Set when framebuf is modified or a redraw is pending
     current_screen = None
     is_shutdown = asyncio.Event()
     # The lock enables user code to synchronise refresh with a realtime process.
     rfsh_lock = asyncio.Lock()
     arbitrate = None  # Optional 3-tuple controls SPI baudrate
+    profiler = None  # Profiler instance if instrumentation is enabled
+    opens = 0  # Count of Screen and Window opens: these redraw the framebuf
     BACK = 0
     STACK = 1
     REPLACE = 2
+    TILE = 5  # Touch index tile size is 32 pixels
 
     _value = None
 
@@ -181,10 +433,25 @@ class Screen:
 
     @classmethod
     def show(cls, force):
+        prof = cls.profiler
+        rec = display.recorder
         for obj in cls.current_screen.displaylist:
             if obj.visible:  # In a buttonlist only show visible button
                 if force or obj.draw:
-                    obj.show()
+                    if prof is not None:
+                        t = ticks_us()
+                    if rec is None:
+                        obj.show()
+                    elif obj.draw or not rec.replay(obj):  # Unchanged: use recording
+                        rec.record(obj)
+                    if prof is not None:
+                        prof.add(obj.__class__.__name__, ticks_diff(ticks_us(), t))
+
+    # Enable instrumentation. size is the number of samples retained per key.
+    @classmethod
+    def profile(cls, size=16):
+        cls.profiler = Profiler(size) if size else None
+        return cls.profiler
 
     #  Asyncio should be running before we change screen. It may be running before
     # the GUI is started. In the normal case where it is not, .runner starts asyncio
@@ -223,6 +490,7 @@ class Screen:
         else:  # mode is BACK
             ins_new = cls_new_screen  # An object, not a class
         cls.current_screen = ins_new
+        cls.opens += 1
         ins_new.on_open()  # Optional subclass method
         ins_new._do_open(ins_old)  # Clear and redraw
         ins_new.after_open()  # Optional subclass method
@@ -255,8 +523,8 @@ class Screen:
         mt.append(asyncio.create_task(cls._touchtest()))  # Touch handling
         if cls.do_gc:
             mt.append(asyncio.create_task(cls.garbage_collect()))
-        if _vb:
-            mt.append(asyncio.create_task(cls.show_ram()))  # Ram reports
+        if _vb or cls.profiler is not None:
+            mt.append(asyncio.create_task(cls.show_ram()))  # Ram or profile reports
         await cls.is_shutdown.wait()  # and wait for termination.
         cls.is_shutdown.clear()
         # Task cancellation and shutdown
@@ -274,8 +542,10 @@ class Screen:
         cls.current_screen = None  # Ensure another demo can run (??)
 
     # If the display driver has an async refresh method, determine the split
-    # value which must be a factor of the height. In the unlikely event of
-    # no factor, do_refresh confers no benefit, so use synchronous code.
+    # value. Drivers with a time budget (.BUDGET) accept any split and, if the
+    # budget is set, use it in place of split. For others split must be a factor
+    # of the height. In the unlikely event of no factor, do_refresh confers no
+    # benefit, so use synchronous code.
     @classmethod
     async def auto_refresh(cls):
         arfsh = hasattr(ssd, "do_refresh")  # Refresh can be asynchronous.
@@ -285,15 +555,37 @@ class Screen:
         if pause := (0 if arb is None else 100):
             # if cls.arbitrate:  # Ensure we start at high baudrate
             arb[0].init(baudrate=arb[1])
-        if arfsh:
+        if arfsh and hasattr(ssd, "BUDGET"):
+            split = 8
+        elif arfsh:
             h = ssd.height
             # split = max(y for y in (1, 2, 3, 5, 7) if not h % y)
             # Increase split to provide faster touch response (at possible cost in refresh rate)
             split = max(y for y in range(1, 9) if not h % y)
             if split == 1:
                 arfsh = False
+        redraw = cls.redraw
+        redraw.set()  # Ensure an initial refresh
         while True:
+            if cls.idle_wait:  # Nothing to do until a widget or primitive changes the framebuf
+                await redraw.wait()
             Screen.show(False)  # Update stale controls. No physical refresh.
+            redraw.clear()  # Drawing after this point triggers another refresh
+            prof = cls.profiler
+            if (rects := display.dirty()) is not None:  # Partial refresh
+                t = ticks_us()
+                if hasattr(ssd, "do_refresh_rects"):  # Lock is released between rects
+                    await ssd.do_refresh_rects(rects, cls.rfsh_lock)
+                else:
+                    for rect in rects:
+                        async with cls.rfsh_lock:
+                            ssd.show_rect(*rect)
+                        await asyncio.sleep_ms(0)
+                if prof is not None:
+                    prof.add("show_rect", ticks_diff(ticks_us(), t))
+                await asyncio.sleep_ms(pause)
+                continue
+            t = ticks_us()
             # Now perform physical refresh.
             # If there is no user locking, .rfsh_lock will be acquired immediately
             if arfsh and gran and ssd.lock_mode:  # Async refresh, display driver can handle lock
@@ -307,6 +599,8 @@ class Screen:
                         await ssd.do_refresh(split)  # Yield at intervals during refresh
                     else:
                         ssd.show()  # Synchronous (blocking) refresh.
+            if prof is not None:
+                prof.add("refresh", ticks_diff(ticks_us(), t))
             await asyncio.sleep_ms(pause)  # Let user code respond to event
 
     @classmethod
@@ -314,24 +608,42 @@ class Screen:
         arb = cls.arbitrate  # Bus arbitration
         if arb is not None:
             spi = arb[0]
+        tsf = getattr(touch, "tsf", None)  # Interrupt driven touch
+        t = False
         while True:
-            await asyncio.sleep_ms(0)
+            if tsf is None:
+                await asyncio.sleep_ms(0)
+            elif t:  # Touch in progress: poll at a fixed rate
+                await asyncio.sleep_ms(touch.period)
+            else:  # Wait for start of touch
+                await tsf.wait()
             async with cls.rfsh_lock:  # Honour user lock.
                 cs = cls.current_screen
                 tl = cs.lstactive  # Active (touchable) widgets
                 ids = id(cls.current_screen)
+                if (prof := cls.profiler) is not None:
+                    ts = ticks_us()
                 if arb is None:
                     t = touch.poll()
                 else:  # No need for to lock out refresh: synchronous code.
                     spi.init(baudrate=arb[2])
                     t = touch.poll()
                     spi.init(baudrate=arb[1])
+                if prof is not None:
+                    prof.add("poll", ticks_diff(ticks_us(), ts))
                 if t:  # Display is touched.
                     if cs.autoclose(trow := touch.row, tcol := touch.col):
                         continue  # Window has closed. Loop again with new Screen
-                    for obj in (a for a in tl if a.visible and not a.greyed_out()):
+                    # Only test widgets whose tile contains the touch
+                    hits = cs._hits(trow, tcol)
+                    for obj in (a for a in hits if a.visible and not a.greyed_out()):
+                        if prof is not None:
+                            ts = ticks_us()
                         if obj._trytouch(trow, tcol):
                             # Run user "on press" callback if touched
+                            if prof is not None:
+                                dt = ticks_diff(ticks_us(), ts)
+                                prof.add(f"cb {obj.__class__.__name__}", dt)
                             break  # No need to check other objects
                         if ids != id(Screen.current_screen):  # cb may have changed screen
                             break  # get new touchlist
@@ -339,7 +651,10 @@ class Screen:
                     for obj in (a for a in tl if a.was_touched):
                         obj.was_touched = False  # Call _untouched once only
                         obj.busy = False
+                        ts = ticks_us()
                         obj._untouched()  # Run "on release" callback
+                        if prof is not None:
+                            prof.add(f"cb {obj.__class__.__name__}", ticks_diff(ticks_us(), ts))
 
     @classmethod
     async def garbage_collect(cls):
@@ -347,12 +662,15 @@ class Screen:
             await asyncio.sleep_ms(500)
             gc.collect()
 
-    @staticmethod
-    async def show_ram():
-        while _vb:
+    @classmethod
+    async def show_ram(cls):
+        while _vb or cls.profiler is not None:
             await asyncio.sleep(20)
             gc.collect()
-            print(f"Free RAM {gc.mem_free() >> 10}KiB")
+            if (prof := cls.profiler) is not None:
+                prof.summary()
+            else:
+                print(f"Free RAM {gc.mem_free() >> 10}KiB")
 
     @classmethod
     def back(cls):
@@ -371,10 +689,12 @@ class Screen:
         # which may change at runtime.
         if obj.active:
             inst.lstactive.append(obj)
+            inst._grid = None  # Touch index is rebuilt on next touch
         inst.displaylist.append(obj)  # All displayable objects
 
     def __init__(self):
         self.lstactive = []  # Controls which respond to touch
+        self._grid = None  # Spatial index of .lstactive
         self.displaylist = []  # All displayable objects
         self.tasks = []  # Instance can register tasks for cancellation
         self.height = ssd.height  # Occupies entire display
@@ -386,8 +706,14 @@ class Screen:
 
     def _do_open(self, old_screen):  # Window overrides
         dev = display.usegrey(False)
-        # If opening a Screen from a Window just blank and redraw covered area
-        if isinstance(old_screen, Window):
+        # If opening a Screen from a Window restore the covered area from a snapshot
+        # if one exists, otherwise blank and redraw it.
+        if isinstance(old_screen, Window) and (snap := old_screen._snap) is not None:
+            x0, y0, _, _, w, h = old_screen._list_dims()
+            ssd.blit(snap, x0, y0)
+            old_screen._snap = None
+            dev.mark(x0, y0, w, h)
+        elif isinstance(old_screen, Window):
             x0, y0, x1, y1, w, h = old_screen._list_dims()
             dev.fill_rect(x0, y0, w, h, color_map[BG])  # Blank to screen BG
             for obj in [z for z in self.displaylist if z.overlaps(x0, y0, x1, y1)]:
@@ -398,6 +724,29 @@ class Screen:
             dev.clr_scr()  # Clear framebuf but don't update display
             Screen.show(True)  # Force full redraw
 
+    # Touch hit-testing. Active widgets are indexed by the square tiles (of side
+    # 1 << TILE pixels) overlapped by their bounding box. The index is built on
+    # first touch because widget dimensions are set after .addobject is called.
+    # Visibility and greyed-out state are tested at touch time.
+    def _index(self):
+        t = Screen.TILE
+        nc = (ssd.width >> t) + 1  # Tiles per row
+        grid = {}
+        for obj in self.lstactive:  # Preserve list order within each tile
+            for r in range(max(obj.row, 0) >> t, ((obj.row + obj.height) >> t) + 1):
+                for c in range(max(obj.col, 0) >> t, ((obj.col + obj.width) >> t) + 1):
+                    if (k := r * nc + c) in grid:
+                        grid[k].append(obj)
+                    else:
+                        grid[k] = [obj]
+        self._grid = grid
+
+    def _hits(self, row, col):  # Return candidate widgets for a touch
+        if self._grid is None:
+            self._index()
+        t = Screen.TILE
+        return self._grid.get((row >> t) * ((ssd.width >> t) + 1) + (col >> t), ())
+
     # Methods optionally implemented in subclass
     def on_open(self):
         return
@@ -429,6 +778,17 @@ class Window(Screen):
     def close():  # More intuitive name for popup window
         Screen.back()
 
+    pool = None  # Shared buffer for snapshots of the area under a Window
+
+    # Allocate a pool of nbytes for saving the framebuf under a Window. A single
+    # pool suffices because Windows are modal. nbytes == 0 disables snapshots.
+    @staticmethod
+    def snapshot(nbytes):
+        Window.pool = None
+        gc.collect()
+        if nbytes:
+            Window.pool = bytearray(nbytes)
+
     def __init__(
         self,
         row,
@@ -451,10 +811,26 @@ class Window(Screen):
         self.fgcolor = fgcolor if fgcolor is not None else color_map[FG]
         self.bgcolor = bgcolor if bgcolor is not None else color_map[BG]
         self.closable = closable
+        self._snap = None  # FrameBuffer holding area under Window
+
+    # Copy the framebuf region to be covered into the pool (if large enough).
+    def _save(self):
+        self._snap = None
+        w = self.width
+        h = self.height
+        # Not possible if the driver records drawing rather than holding a framebuf
+        if getattr(ssd, "dlist", None) is not None:
+            return
+        if (pool := Window.pool) is not None and hasattr(ssd, "mode"):
+            if (n := bufsize(ssd.mode, w, h)) is not None and n <= len(pool):
+                snap = framebuf.FrameBuffer(memoryview(pool)[:n], w, h, ssd.mode)
+                snap.blit(ssd, -self.col, -self.row)
+                self._snap = snap
 
     def _do_open(self, old_screen):
         dev = display.usegrey(False)
         x, y = self.col, self.row
+        self._save()
         dev.fill_rect(x, y, self.width, self.height, self.bgcolor)
         if self.draw_border:
             dev.rect(x, y, self.width, self.height, self.fgcolor)
@@ -476,6 +852,9 @@ class Window(Screen):
 
 # Base class for all displayable objects
 class Widget:
+    recordable = True  # All drawing is done by .show: output may be recorded
+    _dl = None  # DisplayList holding recorded output
+
     def __init__(
         self,
         writer,
@@ -516,7 +895,7 @@ class Widget:
         self.mrow = row + height + 2  # in subclass. Allow for border.
         self.mcol = col + width + 2
         self.visible = True  # Used by ButtonList class for invisible buttons
-        self.draw = True  # Signals that obect must be redrawn
+        self.draw = True  # Signals that obect must be redrawn (property)
         self._value = value
         self.minval = 0  # FP value: self.minval <= value <= 1.0
 
@@ -547,6 +926,17 @@ class Widget:
         self.busy = False  # Currently touched
         self.can_drag = False  # Accept multiple touches
 
+    # Requesting a redraw wakes the refresh task if it is waiting on idle.
+    @property
+    def draw(self):
+        return self._draw
+
+    @draw.setter
+    def draw(self, val):
+        self._draw = val
+        if val:
+            Screen.redraw.set()
+
     def warning(self):
         obj = self.__class__.__name__
         print(f"Warning: attempt to create {obj} outside screen dimensions.")
@@ -574,11 +964,14 @@ class Widget:
 
     # Called from subclass prior to populating framebuf with control
     def show(self, black=True):
+        self._dl = None  # Any recording is invalid. Recorder replaces it.
         if self.screen != Screen.current_screen:
             # Can occur if a control's action is to change screen.
             return False  # Subclass abandons
         self.draw = False
         self.draw_border()
+        # Subclasses may draw directly to ssd: mark bounding box and border.
+        display.mark(self.col - 2, self.row - 2, self.width + 4, self.height + 4)
         # Blank controls' space
         if self.visible:
             dev = display.usegrey(self._greyed_out)
@@ -623,6 +1016,7 @@ class Widget:
     def greyed_out(self, val=None):
         if val is not None and self.active and self._greyed_out != val:
             self._greyed_out = val
+            self._dl = None  # Any recording shows the old state
             if self.screen is Screen.current_screen:
                 display.usegrey(val)
                 self.show()
@@ -1,6 +1,8 @@
 # writer.py Implements the Writer class.
 # Handles colour, word wrap and tab stops
 
+# V0.5.3 Oct 2025 CWriter caches glyph FrameBuffer instances. Character widths
+# are looked up in a table built once per font.
 # V0.5.2 May 2025 Fix bug whereby glyph clipping might be attempted.
 # V0.5.1 Dec 2022 Support 4-bit color display drivers.
 # V0.5.0 Sep 2021 Color now requires firmware >= 1.17.
@@ -25,7 +27,7 @@
 import framebuf
 from uctypes import bytearray_at, addressof
 
-__version__ = (0, 5, 2)
+__version__ = (0, 5, 3)
 
 
 class DisplayState:
@@ -34,6 +36,190 @@ class DisplayState:
         self.text_col = 0
 
 
+# Bounded LRU cache of glyph FrameBuffer instances keyed by character. Slots
+# are preallocated; when full the least recently used glyph is replaced.
+class GlyphCache:
+    def __init__(self, size):
+        self.size = size
+        self.index = {}  # char: slot no.
+        self.chars = [None] * size
+        self.fbs = [None] * size
+        self.ticks = [0] * size  # Time of last use
+        self.tick = 0
+
+    def get(self, char):
+        if (n := self.index.get(char)) is None:
+            return None
+        self.tick += 1
+        self.ticks[n] = self.tick
+        return self.fbs[n]
+
+    def put(self, char, fb):
+        if (n := len(self.index)) >= self.size:  # Full: evict LRU
+            ticks = self.ticks
+            n = min(range(self.size), key=lambda x: ticks[x])
+            del self.index[self.chars[n]]
+        self.tick += 1
+        self.index[char] = n
+        self.chars[n] = char
+        self.fbs[n] = fb
+        self.ticks[n] = self.tick
+
+    def clear(self):
+        self.index.clear()
+        for n in range(self.size):
+            self.chars[n] = None
+            self.fbs[n] = None
+
+
+# Advance widths of a font's glyphs. Widths of characters in the range min_ch to
+# 255 are held in a bytearray built once. Other characters (e.g. in sparse
+# Unicode fonts) are looked up on first use and stored in a dict.
+class Metrics:
+    def __init__(self, font):
+        self.font = font
+        self.lo = lo = font.min_ch()
+        hi = min(font.max_ch(), 255)
+        # Fonts may provide .width to avoid fetching glyphs (e.g. FontFile)
+        self._gw = getattr(font, "width", None) or (lambda ch: font.get_ch(ch)[2])
+        self.table = bytearray(self._gw(chr(c)) for c in range(lo, hi + 1))
+        self.extra = {}
+        self.true = None  # True widths: allocated on first use
+        self.xtrue = {}
+
+    def width(self, ch):
+        if 0 <= (n := ord(ch) - self.lo) < len(self.table):
+            return self.table[n]
+        if (w := self.extra.get(ch)) is None:
+            w = self._gw(ch)
+            self.extra[ch] = w
+        return w
+
+    # Width in pixels of text[start:end]
+    def measure(self, text, start=0, end=None):
+        end = len(text) if end is None else end
+        table = self.table
+        lo = self.lo
+        nt = len(table)
+        l = 0
+        for i in range(start, end):
+            if 0 <= (n := ord(text[i]) - lo) < nt:
+                l += table[n]
+            else:
+                l += self.width(text[i])
+        return l
+
+    # Return the number of leading characters of text[start:end] which fit in max_px
+    def fit(self, text, max_px, start=0, end=None):
+        end = len(text) if end is None else end
+        table = self.table
+        lo = self.lo
+        nt = len(table)
+        l = 0
+        for i in range(start, end):
+            if 0 <= (n := ord(text[i]) - lo) < nt:
+                l += table[n]
+            else:
+                l += self.width(text[i])
+            if l > max_px:
+                return i - start
+        return end - start
+
+    # Return the printable width of a glyph less any blank columns on RHS. Values
+    # are computed on first use and held in a table parallel to .table; a 0
+    # entry means not yet computed.
+    def truelen(self, ch):
+        if 0 <= (n := ord(ch) - self.lo) < len(self.table):
+            if (true := self.true) is None:
+                true = bytearray(len(self.table))
+                self.true = true
+            if not (w := true[n]):
+                w = self._truelen(ch)
+                true[n] = w
+            return w
+        if (w := self.xtrue.get(ch)) is None:
+            w = self._truelen(ch)
+            self.xtrue[ch] = w
+        return w
+
+    # Find the rightmost lit column scanning whole bytes rather than pixels
+    def _truelen(self, ch):
+        glyph, ht, wd = self.font.get_ch(ch)
+        gbytes = (wd + 7) // 8  # No. of bytes per row of glyph
+        mc = 0  # Max non-blank column
+        for row in range(0, ht * gbytes, gbytes):
+            for gbyte in range(gbytes - 1, mc // 8 - 1, -1):
+                if data := glyph[row + gbyte]:
+                    col = gbyte * 8 + 7
+                    while not data & 1:
+                        data >>= 1
+                        col -= 1
+                    if col > mc:
+                        mc = col
+                    break
+            if mc + 1 == wd:
+                break  # All done: no trailing space
+        return mc + 1
+
+    # Single pass line breaker. Find the line starting at text[start] which fits
+    # in max_px, breaking at a newline or space where possible. Returns
+    # (end, nxt): the line is text[start:end] and the next starts at text[nxt].
+    # Trailing spaces are dropped. If a word is split (no space in the line)
+    # nxt == end. If oh is set a final char which only overhangs by blank
+    # columns is deemed to fit.
+    def wrap(self, text, max_px, start=0, oh=False):
+        table = self.table
+        lo = self.lo
+        nt = len(table)
+        ls = len(text)
+        sp = -1  # Index of last space in line
+        l = 0
+        i = start
+        while i < ls:
+            c = text[i]
+            if c == "\n":
+                return i, i + 1
+            if c == " ":
+                sp = i
+            if 0 <= (n := ord(c) - lo) < nt:
+                w = table[n]
+            else:
+                w = self.width(c)
+            if l + w > max_px:
+                break
+            l += w
+            i += 1
+        else:
+            return ls, ls  # Remainder of text fits
+        if (
+            oh  # Last char of text or word may fit if its RHS columns are blank
+            and (i + 1 == ls or (c != " " and text[i + 1] in " \n"))
+            and l + self.truelen(c) <= max_px
+        ):
+            if (i := i + 1) == ls:
+                return ls, ls
+        elif c != " ":
+            if sp < 0:  # No space to break at: split the word
+                return i, i
+            i = sp
+        end = i
+        while end > start and text[end - 1] == " ":
+            end -= 1
+        while i < ls and text[i] == " ":  # Skip spaces at the break
+            i += 1
+        return end, i
+
+
+_metrics = {}  # Metrics instances keyed by font
+
+
+def metrics(font):
+    if (m := _metrics.get(font)) is None:
+        m = Metrics(font)
+        _metrics[font] = m
+    return m
+
+
 def _get_id(device):
     if not isinstance(device, framebuf.FrameBuffer):
         raise ValueError("Device must be derived from FrameBuffer.")
@@ -67,6 +253,7 @@ class Writer:
         if self.devid not in Writer.state:
             Writer.state[self.devid] = DisplayState()
         self.font = font
+        self.metrics = metrics(font)  # Glyph width lookup
         if font.height() >= device.height or font.max_width() >= device.width:
             raise ValueError("Font too large for screen")
         # Allow to work with reverse or normal font mapping
@@ -136,63 +323,39 @@ class Writer:
                 self._printchar("\n")
 
     def _printline(self, string, invert):
-        rstr = None
-        if self.wrap and self.stringlen(string, True):  # Length > self.screenwidth
-            pos = 0
-            lstr = string[:]
-            while self.stringlen(lstr, True):  # Length > self.screenwidth
-                pos = lstr.rfind(" ")
-                lstr = lstr[:pos].rstrip()
-            if pos > 0:
-                rstr = string[pos + 1 :]
-                string = lstr
-
-        for char in string:
-            self._printchar(char, invert)
-        if rstr is not None:
-            self._printchar("\n")
-            self._printline(rstr, invert)  # Recurse
+        wrap = self.metrics.wrap
+        ls = len(string)
+        start = 0
+        while start < ls:
+            end = nxt = ls
+            if self.wrap:
+                end, nxt = wrap(string, self.screenwidth - self._getstate().text_col, start, True)
+                # A line starting with a space wraps there, printing an empty line.
+                if nxt == end:  # No space to wrap at: print all, overhang is clipped
+                    end = nxt = ls
+            for i in range(start, end):
+                self._printchar(string[i], invert)
+            if nxt > end:  # Wrapped at a space
+                self._printchar("\n")
+            start = nxt
 
     def stringlen(self, string, oh=False):
-        if not len(string):
+        if not (ls := len(string)):
             return 0
+        if not oh:
+            return self.metrics.measure(string)
         sc = self._getstate().text_col  # Start column
         wd = self.screenwidth
-        l = 0
-        for char in string[:-1]:
-            _, _, char_width = self.font.get_ch(char)
-            l += char_width
-            if oh and l + sc > wd:
-                return True  # All done. Save time.
-        char = string[-1]
-        _, _, char_width = self.font.get_ch(char)
-        if oh and l + sc + char_width > wd:
-            l += self._truelen(char)  # Last char might have blank cols on RHS
-        else:
-            l += char_width  # Public method. Return same value as old code.
-        return l + sc > wd if oh else l
+        if (n := self.metrics.fit(string, wd - sc)) == ls:
+            return False  # Whole string fits
+        if n < ls - 1:
+            return True  # Overhang occurs before last char
+        # Only the last char overhangs. It might have blank cols on RHS
+        return self.metrics.measure(string, 0, n) + self._truelen(string[-1]) + sc > wd
 
     # Return the printable width of a glyph less any blank columns on RHS
     def _truelen(self, char):
-        glyph, ht, wd = self.font.get_ch(char)
-        div, mod = divmod(wd, 8)
-        gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
-        mc = 0  # Max non-blank column
-        data = glyph[(wd - 1) // 8]  # Last byte of row 0
-        for row in range(ht):  # Glyph row
-            for col in range(wd - 1, -1, -1):  # Glyph column
-                gbyte, gbit = divmod(col, 8)
-                if gbit == 0:  # Next glyph byte
-                    data = glyph[row * gbytes + gbyte]
-                if col <= mc:
-                    break
-                if data & (1 << (7 - gbit)):  # Pixel is lit (1)
-                    mc = col  # Eventually gives rightmost lit pixel
-                    break
-            if mc + 1 == wd:
-                break  # All done: no trailing space
-        # print('Truelen', char, wd, mc + 1)  # TEST
-        return mc + 1
+        return self.metrics.truelen(char)
 
     def _get_char(self, char, recurse):
         if not recurse:  # Handle tabs
@@ -266,11 +429,16 @@ class CWriter(Writer):
         ssd.lut[x + 1] = c >> 8
         return idx
 
-    def __init__(self, device, font, fgcolor=None, bgcolor=None, verbose=True):
+    def __init__(self, device, font, fgcolor=None, bgcolor=None, verbose=True, cache=32):
         if not hasattr(device, "palette"):
             raise OSError("Incompatible device driver.")
 
         super().__init__(device, font, verbose)
+        # Cached FrameBuffers reference glyph memory, which must be static
+        static = getattr(font, "static", True)
+        self.cache = GlyphCache(cache) if cache and static else None
+        # Blits may be retained by a display list: copy glyphs which may be overwritten
+        self._copy = not static
         if bgcolor is not None:  # Assume monochrome.
             self.bgcolor = bgcolor
         if fgcolor is not None:
@@ -283,9 +451,15 @@ class CWriter(Writer):
         self._get_char(char, recurse)
         if self.glyph is None:
             return  # All done
-        buf = bytearray_at(addressof(self.glyph), len(self.glyph))
-        fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
-        palette = self.device.palette
+        if (cache := self.cache) is None or (fbc := cache.get(char)) is None:
+            if self._copy:
+                buf = bytearray(self.glyph)
+            else:
+                buf = bytearray_at(addressof(self.glyph), len(self.glyph))
+            fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
+            if cache is not None:
+                cache.put(char, fbc)
+        palette = self.device.palette  # Only updated if colors change
         palette.bg(self.fgcolor if invert else self.bgcolor)
         palette.fg(self.bgcolor if invert else self.fgcolor)
         self.device.blit(fbc, s.text_col, s.text_row, -1, palette)
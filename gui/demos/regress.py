@@ -0,0 +1,149 @@
+# regress.py Regression checks for micropython-touch
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# Runs without hardware on the Unix port. Copy setup_examples/headless_unix.py
+# to touch_setup.py and issue
+# $ micropython -m gui.demos.regress
+# Each check prints its name followed by "ok" or "FAIL". The GUI runs with
+# partial refresh and widget recording enabled and with Screen.idle_wait set.
+
+import touch_setup  # Create a display instance
+from gui.core.tgui import Screen, Display, ssd
+
+# Replace the display with one using partial refresh and recording. This must
+# precede widget imports because some modules bind display when imported.
+touch_setup.display = Display(ssd, touch_setup.tpad, partial=True, record=True)
+touch_setup.tpad.load(())  # No touches
+Screen.idle_wait = True
+
+import asyncio
+from gui.core.writer import CWriter
+import gui.fonts.font10 as font
+from gui.core.colors import *
+from gui.widgets.textbox import Textbox
+from gui.widgets.buttons import Button
+from gui.widgets.graph import CartesianGraph, Curve, PolarGraph, PolarCurve
+
+wri = CWriter(ssd, font, verbose=False)
+failures = 0
+
+
+def check(name, ok):
+    global failures
+    print(f"{name:<48}{'ok' if ok else 'FAIL'}")
+    failures += not ok
+
+
+# Textbox word wrap keeps empty lines and never emits a newline as a line.
+def textbox(tb):
+    for s, lines in (("a\n\nb", ["a", "", "b"]), ("\nab", ["", "ab"]), ("\n\n", ["", ""])):
+        tb.clear()
+        tb.append(s, ntrim=10)
+        check(f"Textbox wrap {s!r}", tb.lines == lines)
+
+
+# Record the rectangles sent by partial refresh.
+sent = []
+_rects = ssd.do_refresh_rects
+
+
+async def spy(rects, elock=None):
+    sent.extend(rects)
+    await _rects(rects, elock)
+
+
+ssd.do_refresh_rects = spy
+
+
+async def settle():  # Allow the refresh task to run
+    for _ in range(20):
+        await asyncio.sleep_ms(20)
+
+
+# Return True if the sent rectangles cover the box x0 <= x < x1, y0 <= y < y1.
+def covered(x0, y0, x1, y1):
+    for y in range(y0, y1):
+        for x in range(x0, x1):
+            if not any(r[0] <= x < r[0] + r[2] and r[1] <= y < r[1] + r[3] for r in sent):
+                return False
+    return True
+
+
+# Plotting a curve wakes the refresh task (idle_wait) and marks the line for
+# partial refresh.
+async def graph(g, curve, p0, p1, scale):
+    await settle()
+    sent.clear()
+    idle = not Screen.redraw.is_set()
+    curve.point(*p0)
+    curve.point(*p1)
+    name = type(g).__name__
+    check(f"{name} curve wakes idle refresh", idle and Screen.redraw.is_set())
+    await settle()
+    xs, ys = scale(g, p0)
+    xe, ye = scale(g, p1)
+    bbox = (min(xs, xe), min(ys, ye), max(xs, xe) + 1, max(ys, ye) + 1)
+    check(f"{name} curve sent by partial refresh", covered(*bbox))
+
+
+def cscale(g, p):
+    return round(g.xp_origin + p[0] * g.x_axis_len), round(g.yp_origin - p[1] * g.y_axis_len)
+
+
+def pscale(g, p):
+    return round(g.xp_origin + p[0].real * g.radius), round(g.yp_origin - p[0].imag * g.radius)
+
+
+# Framebuf contents under a widget
+def pixels(w):
+    wd = ssd.width // 2
+    x0 = w.col // 2
+    x1 = (w.col + w.width + 1) // 2
+    return [bytes(ssd.mvb[y * wd + x0 : y * wd + x1]) for y in range(w.row, w.row + w.height)]
+
+
+class EmptyScreen(Screen):
+    pass
+
+
+# Greying out a widget on a hidden screen takes effect when it is shown again,
+# rather than its recording made before the change being replayed.
+async def greyed(btn):
+    await settle()
+    before = pixels(btn)
+    Screen.change(EmptyScreen)
+    await settle()
+    btn.greyed_out(True)
+    Screen.back()
+    await settle()
+    check("Greyed out on hidden screen is redrawn", pixels(btn) != before)
+    btn.greyed_out(False)
+    await settle()
+    check("Restored after greying out", pixels(btn) == before)
+
+
+class BaseScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.tb = Textbox(wri, 150, 10, 200, 3, clip=False)
+        self.cg = CartesianGraph(wri, 10, 10, height=100, width=140)
+        self.pg = PolarGraph(wri, 10, 180, height=100)
+        self.btn = Button(wri, 120, 10, text="Grey", bgcolor=BLUE)
+
+    def after_open(self):
+        if not self.tasks:  # Not when returning from another screen
+            self.reg_task(self.run())
+
+    async def run(self):
+        await asyncio.sleep_ms(100)  # Initial refresh
+        textbox(self.tb)
+        await graph(self.cg, Curve(self.cg, YELLOW), (-0.5, -0.3), (0.6, 0.4), cscale)
+        await graph(self.pg, PolarCurve(self.pg, YELLOW), (0.5j,), (-0.4 + 0.2j,), pscale)
+        await greyed(self.btn)
+        print("All checks passed." if not failures else f"{failures} checks failed.")
+        Screen.back()  # Quit
+
+
+Screen.change(BaseScreen)
@@ -4,7 +4,7 @@
 # Copyright (c) 2021-2024 Peter Hinch
 
 import asyncio
-from gui.core.tgui import Screen, Widget, display
+from gui.core.tgui import Screen, Widget, TextImage, display
 from gui.core.colors import *
 
 dolittle = lambda *_: None
@@ -13,6 +13,7 @@ dolittle = lambda *_: None
 class Button(Widget):
     lit_time = 1000
     long_press_time = 1000
+    cache = False  # Cache rendered text
 
     def __init__(
         self,
@@ -47,6 +48,7 @@ class Button(Widget):
         self.litcolor = litcolor
         self.textcolor = self.fgcolor if textcolor is None else textcolor
         self.text = text
+        self._timg = TextImage() if self.cache else None
         self.callback = callback
         self.callback_args = args
         self.onrelease = onrelease
@@ -68,7 +70,9 @@ class Button(Widget):
             display.fillcircle(x, y, self.radius, self.bgcolor)
             display.circle(x, y, self.radius, self.fgcolor)
             if len(self.text):
-                display.print_centred(self.writer, x, y, self.text, self.textcolor, self.bgcolor)
+                display.print_centred(
+                    self.writer, x, y, self.text, self.textcolor, self.bgcolor, False, self._timg
+                )
         else:
             xc = x + w // 2
             yc = y + h // 2
@@ -77,14 +81,28 @@ class Button(Widget):
                 display.rect(x, y, w, h, self.fgcolor)
                 if len(self.text):
                     display.print_centred(
-                        self.writer, xc, yc, self.text, self.textcolor, self.bgcolor
+                        self.writer,
+                        xc,
+                        yc,
+                        self.text,
+                        self.textcolor,
+                        self.bgcolor,
+                        False,
+                        self._timg,
                     )
             elif self.shape == CLIPPED_RECT:  # clipped rectangle
                 display.fill_clip_rect(x, y, w, h, self.bgcolor)
                 display.clip_rect(x, y, w, h, self.fgcolor)
                 if len(self.text):
                     display.print_centred(
-                        self.writer, xc, yc, self.text, self.textcolor, self.bgcolor
+                        self.writer,
+                        xc,
+                        yc,
+                        self.text,
+                        self.textcolor,
+                        self.bgcolor,
+                        False,
+                        self._timg,
                     )
 
     async def shownormal(self):  # Revert to normal color after a delay
@@ -161,6 +161,7 @@ class TSequence(Curve):
 
 
 class Graph(Widget):
+    recordable = False  # Curves are drawn outside .show
     def __init__(self, writer, row, col, height, width, fgcolor, bgcolor, bdcolor, gridcolor):
         super().__init__(writer, row, col, height, width, fgcolor, bgcolor, bdcolor)
         self.x0 = col
@@ -236,6 +237,8 @@ class CartesianGraph(Graph):
         xe = round(self.xp_origin + end[0] * self.x_axis_len)
         ye = round(self.yp_origin - end[1] * self.y_axis_len)
         ssd.line(xs, ys, xe, ye, color)
+        # Curves are plotted outside .show: request a refresh of the line
+        display.mark(min(xs, xe), min(ys, ye), abs(xe - xs) + 1, abs(ye - ys) + 1)
 
 
 class PolarGraph(Graph):
@@ -291,3 +294,5 @@ class PolarGraph(Graph):
         xe = round(self.xp_origin + end.real * height)
         ye = round(self.yp_origin - end.imag * height)
         ssd.line(xs, ys, xe, ye, color)
+        # Curves are plotted outside .show: request a refresh of the line
+        display.mark(min(xs, xe), min(ys, ye), abs(xe - xs) + 1, abs(ye - ys) + 1)
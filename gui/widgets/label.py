@@ -2,7 +2,7 @@
 
 # Released under the MIT License (MIT). See LICENSE.
 # Copyright (c) 2021-2024 Peter Hinch
-from gui.core.tgui import Widget, display
+from gui.core.tgui import Widget, TextImage, display
 from gui.core.writer import Writer
 from gui.core.colors import *
 
@@ -11,6 +11,7 @@ class Label(Widget):
     LEFT = 0
     CENTRE = 1
     RIGHT = 2
+    cache = False  # Cache rendered text
 
     def __init__(
         self,
@@ -36,6 +37,7 @@ class Label(Widget):
         self.invert = invert
         super().__init__(writer, row, col, height, width, fgcolor, bgcolor, bdcolor)
         self.tcol = col
+        self._timg = TextImage() if self.cache else None
         if text is not None:
             self.value(text, invert)
 
@@ -48,15 +50,7 @@ class Label(Widget):
                 justify = self.justify
             self.tcol = self.col  # Default is left justify
             if sl > self.width:  # Clip
-                font = self.writer.font
-                pos = 0
-                n = 0
-                for ch in text:
-                    pos += font.get_ch(ch)[2]  # width of current char
-                    if pos > self.width:
-                        break
-                    n += 1
-                text = text[:n]
+                text = text[: self.writer.metrics.fit(text, self.width)]
             elif justify == 1:  # Centre
                 self.tcol = self.col + (self.width - sl) // 2
             elif justify == 2:  # Right
@@ -76,5 +70,12 @@ class Label(Widget):
         super().show(False)  # Honour background. Draw or erase border
         if isinstance(txt := super().value(), str):
             display.print_left(
-                self.writer, self.tcol, self.row, txt, self.fgcolor, self.bgcolor, self.invert
+                self.writer,
+                self.tcol,
+                self.row,
+                txt,
+                self.fgcolor,
+                self.bgcolor,
+                self.invert,
+                self._timg,
             )
@@ -109,15 +109,7 @@ class Listbox(Widget):
         nlines = min(dlines, len(self.els))  # Displayable lines
         for n in range(ntop, ntop + nlines):
             text = self.els[n] if self.simple else self.els[n][0]
-            if self.writer.stringlen(text) > self.width:  # Clip
-                font = self.writer.font
-                pos = 0
-                nch = 0
-                for ch in text:
-                    pos += font.get_ch(ch)[2]  # width of current char
-                    if pos > self.width:
-                        break
-                    nch += 1
+            if (nch := self.writer.metrics.fit(text, self.width)) < len(text):  # Clip
                 text = text[:nch]
             if n == self._value:
                 display.fill_rect(x, y + 1, self.width, eh - 1, self.select_color)
@@ -6,7 +6,7 @@
 # Usage:
 # from gui.widgets.textbox import Textbox
 
-from gui.core.tgui import LinearIO
+from gui.core.tgui import LinearIO, Screen, display
 from touch_setup import ssd  # Display driver for Writer
 from gui.core.writer import Writer
 
@@ -17,6 +17,8 @@ import asyncio
 
 
 class Textbox(LinearIO):
+    _owner = None  # Textbox whose rows are the hardware scroll area
+
     def __init__(
         self,
         writer,
@@ -30,6 +32,7 @@ class Textbox(LinearIO):
         bgcolor=None,
         clip=True,
         active=False,
+        hwscroll=False,
     ):
         height = nlines * writer.height
         devht = writer.device.height
@@ -43,48 +46,32 @@ class Textbox(LinearIO):
         self.clip = clip
         self.lines = []
         self.start = 0  # Start line for display
+        # The scroll area spans the display width: the control and its border
+        # must do so too, otherwise anything beside it would scroll with it.
+        self.hwscroll = hwscroll = hwscroll and col <= 2 and col + width + 2 >= devwd
+        if hwscroll:
+            self.recordable = False  # Scrolling draws outside .show
+        self._shown = None  # Lines on screen after a full redraw or hardware scroll
+        self._opens = -1  # Value of Screen.opens at last full redraw
 
     def _add_lines(self, s):
         width = self.width
-        font = self.writer.font
-        n = -1  # Index into string
-        newline = True
-        while True:
-            n += 1
-            if newline:
-                newline = False
-                ls = n  # Start of line being processed
-                col = 0  # Column relative to text area
-            if n >= len(s):  # End of string
-                if n > ls:
-                    self.lines.append(s[ls:])
-                return
-            c = s[n]  # Current char
-            if c == "\n":
-                self.lines.append(s[ls:n])
-                newline = True
-                continue  # Line fits window
-            col += font.get_ch(c)[2]  # width of current char
-            if col > width:
-                if self.clip:
-                    p = s[ls:].find("\n")  # end of 1st line
-                    if p == -1:
-                        self.lines.append(s[ls:n])  # clip, discard all to right
-                        return
-                    self.lines.append(s[ls:n])  # clip, discard to 1st newline
-                    n = p  # n will move to 1st char after newline
-                elif c == " ":  # Easy word wrap
-                    self.lines.append(s[ls:n])
-                else:  # Edge splits a word
-                    p = s.rfind(" ", ls, n + 1)
-                    if p >= 0:  # spacechar in line: wrap at space
-                        assert p > 0, "space char in position 0"
-                        self.lines.append(s[ls:p])
-                        n = p
-                    else:  # No spacechar: wrap at end
-                        self.lines.append(s[ls:n])
-                        n -= 1  # Don't skip current char
-                newline = True
+        metrics = self.writer.metrics
+        ls = len(s)
+        start = 0  # Start of line being processed
+        while start < ls:
+            if self.clip:
+                if (nl := s.find("\n", start)) == -1:
+                    nl = ls
+                n = metrics.fit(s, width, start, nl)  # Chars which fit
+                self.lines.append(s[start : start + n])  # clip, discard to newline
+                start = nl + 1
+                continue
+            end, nxt = metrics.wrap(s, width, start)
+            if nxt == end == start:  # A char wider than the box gets its own line
+                end = nxt = start + 1
+            self.lines.append(s[start:end])
+            start = nxt
 
     def _print_lines(self):
         if len(self.lines) == 0:
@@ -106,8 +93,62 @@ class Textbox(LinearIO):
         wri.setcolor()  # Restore defaults
 
     def show(self):
+        if self.hwscroll and self._scroll():
+            return
         if super().show(False):
             self._print_lines()
+            if self.hwscroll:
+                if Textbox._owner is not self:
+                    try:
+                        ssd.vscroll_area(self.row, self.height)
+                    except (AttributeError, OSError):  # Not supported by driver
+                        self.hwscroll = False
+                        return
+                    Textbox._owner = self
+                    display.mark()  # Whole display is rewritten
+                self._shown = self.lines[self.start : self.start + self.nlines]
+                self._opens = Screen.opens
+
+    # Hardware scrolling. If the lines to show are those on screen moved by k
+    # lines, scroll the display and draw only the k new lines. Return success.
+    def _scroll(self):
+        if (
+            not self.draw
+            or (prev := self._shown) is None
+            or Textbox._owner is not self
+            or Screen.opens != self._opens  # Framebuf has been redrawn
+            or self.screen is not Screen.current_screen
+        ):
+            return False
+        n = self.nlines
+        cur = self.lines[self.start : self.start + n]
+        if len(prev) < n or len(cur) < n:
+            return False
+        for k in range(1, n):
+            if prev[k:] == cur[: n - k]:  # Scroll up: new lines at bottom
+                first = n - k
+                break
+            if cur[k:] == prev[: n - k]:  # Scroll down: new lines at top
+                first = 0
+                break
+        else:
+            return False
+        ht = self.writer.height
+        if not ssd.vscroll(k * ht if first else -k * ht):
+            return False
+        self.draw = False
+        self._shown = cur
+        row = self.row + first * ht
+        dev = display.usegrey(self._greyed_out)
+        dev.fill_rect(self.col, row, self.width, k * ht, self.bgcolor)  # Marks region
+        wri = self.writer
+        wri.setcolor(self.fgcolor, self.bgcolor)
+        for line in cur[first : first + k]:
+            Writer.set_textpos(ssd, row, self.col)
+            wri.printstring(line)
+            row += ht
+        wri.setcolor()
+        return True
 
     def append(self, s, ntrim=None, line=None):
         self._add_lines(s)
@@ -54,4 +54,5 @@ tpad = CST816S(i2c, ptrst, pint, ssd)
 # To create a tpad.init line for your displays please read SETUP.md
 # The following is consistent with the SSD constructor args above.
 tpad.init(240, 240, 0, 0, 240, 240, False, True, True)
+# tpad.irq()  # Optional: interrupt mode (see TOUCHPAD.md)
 display = Display(ssd, tpad)
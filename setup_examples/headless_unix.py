@@ -0,0 +1,25 @@
+# headless_unix.py touch_setup.py for running the GUI without hardware
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# Copy to touch_setup.py to run demos under the Unix port, e.g.
+# $ micropython -m gui.demos.simple
+# Display output goes to a mock SPI bus which counts traffic. Touches are
+# replayed from a trace (see touch/replay.py). Frames may be saved with
+# ssd.ppm("frame.ppm").
+
+import gc
+from drivers.headless.headless import HEADLESS as SSD
+
+gc.collect()
+ssd = SSD(height=240, width=320)
+from gui.core.tgui import Display, quiet
+
+quiet()  # Comment this out for periodic free RAM messages
+
+from touch.replay import Replay
+
+# Idle for 200 polls then touch the centre of the screen for 10 polls.
+tpad = Replay(ssd, ((None, None, 200), (120, 160, 10)))
+display = Display(ssd, tpad)
@@ -48,4 +48,5 @@ spi = SoftSPI(mosi=Pin(1), miso=Pin(2), sck=Pin(3))  # 2.5MHz max
 tpad = XPT2046(spi, Pin(0, Pin.OUT, value=1), ssd)
 # To create a tpad.init line for your displays please read SETUP.md
 # tpad.init(240, 320, 157, 150, 3863, 4095, True, True, True)
+# tpad.irq(Pin(5, Pin.IN))  # Optional: interrupt mode if PENIRQ is wired (see TOUCHPAD.md)
 display = Display(ssd, tpad)
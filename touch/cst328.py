@@ -37,6 +37,12 @@ class CST328(ABCTouch):
 
     def isr(self, _):
         self.trig = True
+        if self.tsf is not None:  # Interrupt driven: wake the GUI
+            self.tsf.set()
+
+    # The interrupt pin is assigned in the constructor.
+    def irq(self, period=20):
+        super().irq(None, period=period)
 
     def _write16(self, reg):
         self.i2c.writeto(self.addr, bytes((reg >> 8, reg & 0xFF)))
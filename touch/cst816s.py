@@ -41,6 +41,12 @@ class CST816S(ABCTouch):
 
     def isr(self, _):
         self.trig = True
+        if self.tsf is not None:  # Interrupt driven: wake the GUI
+            self.tsf.set()
+
+    # The interrupt pin is assigned in the constructor.
+    def irq(self, period=20):
+        super().irq(None, period=period)
 
     def acquire(self, buf=bytearray(6)):
         if self.trig:
@@ -0,0 +1,39 @@
+# replay.py Scripted touch driver for testing and benchmarking
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2025 Peter Hinch
+
+# Replays a trace of touches. Each trace entry is a 3-tuple (row, col, n) which
+# causes the next n polls to report a touch at (row, col). If row is None the
+# next n polls report no touch. When the trace is exhausted no further touches
+# occur. Coordinates are in pixels so no calibration is required.
+# tpad = Replay(ssd, ((None, None, 100), (120, 160, 5)))  # Touch centre of screen
+
+from .touch import ABCTouch
+
+
+class Replay(ABCTouch):
+    def __init__(self, ssd, trace=()):
+        super().__init__(ssd, None)  # No preprocessor required
+        self.load(trace)
+
+    def load(self, trace):
+        self._trace = iter(trace)
+        self._entry = None
+        self._count = 0
+        self.polls = 0  # Number of acquisitions
+
+    def acquire(self):
+        self.polls += 1
+        while not self._count:
+            if (entry := next(self._trace, None)) is None:
+                return False  # Trace is exhausted
+            self._entry = entry
+            self._count = entry[2]
+        self._count -= 1
+        row, col, _ = self._entry
+        if row is None:
+            return False
+        self._x = col  # ABCTouch maps x to col and y to row when pre-calibrated
+        self._y = row
+        return True
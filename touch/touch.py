@@ -5,6 +5,7 @@
 # Copyright (c) 2024 Peter Hinch
 from array import array
 from micropython import const
+import asyncio
 
 _SCALE = const(18)  # 12 bits ADC -> 30 bit small int. Subclasses must be limited to 12 bits.
 
@@ -45,8 +46,28 @@ class ABCTouch:
     def __init__(self, ssd, prep):
         self.get = self.acquire if prep is None else prep.get
         self.precal = prep is None
+        self.tsf = None  # ThreadSafeFlag if interrupt driven
+        self.period = 0  # Polling interval (ms) while touched
         self.init(ssd.height, ssd.width, 0, 0, 4095, 4095, False, False, False)
 
+    # Optional interrupt-driven operation. The GUI waits on .tsf until a touch
+    # occurs, then polls every period ms until it ends. pint is the Pin connected
+    # to the controller's interrupt output. Subclasses which already handle the
+    # interrupt pass None and call ._isr from their own handler. trigger defaults
+    # to Pin.IRQ_FALLING. Pin is imported here as some ports (e.g. Unix) lack it.
+    def irq(self, pint=None, trigger=None, period=20):
+        self.tsf = asyncio.ThreadSafeFlag()
+        self.period = period
+        if pint is not None:
+            if trigger is None:
+                from machine import Pin
+
+                trigger = Pin.IRQ_FALLING
+            pint.irq(self._isr, trigger=trigger)
+
+    def _isr(self, _):
+        self.tsf.set()
+
     # Assign orientation and calibration values.
     def init(self, xpix, ypix, xmin, ymin, xmax, ymax, trans, rr, rc):
         self._xpix = xpix  # No of pixels on x axis
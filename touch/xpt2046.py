@@ -25,10 +25,18 @@ class XPT2046(ABCTouch):
         self.spi = spi
         self.wbuf = bytearray(3)
         self.rbuf = bytearray(3)
+        self.pd = 0x03  # PD0, PD1
+
+    # pint is connected to PENIRQ. This is only active if the chip powers down
+    # between conversions.
+    def irq(self, pint, trigger=None, period=20):
+        self.pd = 0
+        super().irq(pint, trigger, period)
 
     def _value(self, chan):
         # PD0, PD1 == 1 See table 8: always powered, penIRQ off. Start bit == 1
-        self.wbuf[0] = 0x83 | (chan << 4)  # 12 bit differential mode
+        # In interrupt mode PD0, PD1 == 0: power down between conversions, penIRQ on.
+        self.wbuf[0] = 0x80 | self.pd | (chan << 4)  # 12 bit differential mode
         self.spi.write_readinto(self.wbuf, self.rbuf)
         return (int.from_bytes(self.rbuf, "big") >> 3) & 0xFFF
 